@@ -0,0 +1,125 @@
+"""
+Benchmark waktu start dan rerun dashboard.
+
+1. Import tingkat modul dasbotepi.py diukur dengan `python -X importtime`
+   di proses baru (cold start), berdampingan dengan set import sebelum
+   import berat ditunda (SEBELUM). Kedua set dijalankan bergantian di setiap
+   percobaan agar gangguan mesin mengenai keduanya, lalu dilaporkan median
+   masing-masing dan median selisih per percobaan. Karena selisih waktu
+   total mudah tertutup noise, dilaporkan juga total waktu import (self
+   time) modul yang hanya dimuat oleh set SEBELUM.
+2. Rerun halaman diukur dengan streamlit.testing (AppTest), termasuk
+   halaman teks yang tidak membutuhkan Plotly.
+3. Laporan import lazy dari telemetry.py (modul yang baru dimuat saat
+   halaman grafik dibuka).
+
+Pemakaian:
+    python bench_startup.py --runs 5
+"""
+import argparse
+import ast
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+APP = Path(__file__).resolve().parent / "dasbotepi.py"
+# Import pihak ketiga/stdlib di tingkat modul dasbotepi.py sebelum Plotly,
+# PIL, dan json dipindah ke import lazy
+SEBELUM = ["streamlit", "pandas", "plotly.express", "plotly.subplots", "plotly.graph_objects", "PIL.Image", "json"]
+
+
+def top_level_imports(path=APP):
+    """Nama modul yang di-import di tingkat modul (bukan di dalam halaman/fungsi)."""
+    tree = ast.parse(path.read_text(encoding="utf-8"))
+    nama = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            nama += [a.name for a in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            nama.append(node.module)
+    return nama
+
+
+def importtime(modul):
+    """Total waktu import kumulatif (ms), rincian per modul tingkat atas, dan self time per modul."""
+    hasil = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import " + ", ".join(modul)],
+        cwd=APP.parent, capture_output=True, text=True, check=True,
+    )
+    rincian = {}
+    sendiri = {}
+    for baris in hasil.stderr.splitlines():
+        if not baris.startswith("import time:") or "|" not in baris:
+            continue
+        awal, kumulatif, nama = baris.split("|")
+        if not kumulatif.strip().isdigit():
+            continue  # baris judul
+        sendiri[nama.strip()] = int(awal.split(":")[1]) / 1000
+        if nama.startswith("  "):
+            continue  # sub-import, sudah termasuk di induknya
+        rincian[nama.strip()] = int(kumulatif) / 1000
+    return sum(rincian.values()), rincian, sendiri
+
+
+def rerun_ms(halaman, runs):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(str(APP), default_timeout=120)
+    at.session_state["selected"] = halaman
+    at.run()  # pemanasan: cache terisi
+    durasi = []
+    for _ in range(runs):
+        mulai = time.perf_counter()
+        at.run()
+        durasi.append((time.perf_counter() - mulai) * 1000)
+    return statistics.median(durasi)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    sesudah = top_level_imports()
+    # Modul lokal sama di kedua set; yang berbeda hanya import berat
+    sebelum = SEBELUM + [m for m in sesudah if m not in SEBELUM]
+    total = {"sebelum": [], "sesudah": []}
+    rincian = {}
+    sendiri = {}
+    tambahan = []
+    for _ in range(args.runs):
+        for label, modul in (("sebelum", sebelum), ("sesudah", sesudah)):
+            t, rincian[label], sendiri[label] = importtime(modul)
+            total[label].append(t)
+        tambahan.append(sum(ms for nama, ms in sendiri["sebelum"].items() if nama not in sendiri["sesudah"]))
+    selisih = [a - b for a, b in zip(total["sebelum"], total["sesudah"])]
+    hanya_sebelum = sorted(set(sendiri["sebelum"]) - set(sendiri["sesudah"]))
+
+    print(f"Import tingkat modul, cold start (median {args.runs}x)")
+    for label, modul in (("sebelum", sebelum), ("sesudah", sesudah)):
+        print(f"  {label:<8} {statistics.median(total[label]):8.1f} ms  ({', '.join(modul)})")
+        for nama, ms in sorted(rincian[label].items(), key=lambda kv: kv[1], reverse=True)[:8]:
+            print(f"    {nama:<24} {ms:8.1f} ms")
+    sebaran = f"{min(selisih):.1f} – {max(selisih):.1f}"
+    print(f"  selisih  {statistics.median(selisih):8.1f} ms  (per percobaan: {sebaran} ms)")
+    print(
+        f"  import yang tidak lagi dimuat: {len(hanya_sebelum)} modul, "
+        f"{statistics.median(tambahan):.1f} ms (median self time)"
+    )
+    akar = sorted({nama.split(".")[0] for nama in hanya_sebelum})
+    print(f"    paket: {', '.join(akar)}")
+
+    print("Rerun halaman (median)")
+    for halaman in ["Deskripsi Penyakit", "About Research", "Home", "Karakteristik Wilayah dan Kasus HIV"]:
+        print(f"  {halaman:<38} {rerun_ms(halaman, args.runs):8.1f} ms")
+
+    import telemetry
+    print("Import lazy (telemetry)")
+    for nama, ms in telemetry.import_report().items():
+        print(f"  {nama:<24} {ms:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
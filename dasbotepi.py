@@ -1,125 +1,29 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-from PIL import Image
-from plotly.subplots import make_subplots
-import plotly.graph_objects as go
-import json
+from functools import partial
+import data_cube
+import data_store
+import exports
+import intervals
+import query_engine
+import stats_catalog
+import telemetry
+
+# Plotly hanya di-import oleh halaman yang menampilkan grafik
+# (telemetry.lazy_import), agar start proses dan rerun halaman teks tetap ringan.
 
 # ==============================
 # KONFIGURASI DASHBOARD
 # ==============================
 st.set_page_config(page_title="Dashboard Kasus HIV - Jawa Barat 2024", layout="wide")
 
-# Custom CSS untuk tampilan modern seperti dashboard TBC
-st.markdown("""
-<style>
-
-    /* ============================= */
-    /* SIDEBAR */
-    /* ============================= */
-    [data-testid="stSidebar"] {
-        background-color: #003566;
-        width: 260px !important;
-    }
-
-    [data-testid="stSidebar"] h1,
-    [data-testid="stSidebar"] p,
-    [data-testid="stSidebar"] a,
-    [data-testid="stSidebar"] label {
-        color: white !important;
-        font-size: 17px !important;
-    }
-
-    [data-testid="stSidebar"] .stButton > button {
-        background-color: transparent;
-        color: #ffffff;
-        border: 1px solid #ffffff33;
-        border-radius: 12px;
-        width: 100%;
-        text-align: center;
-        font-weight: 600;
-        margin-top: 8px;
-        padding: 10px;
-        font-size: 17px;
-    }
-
-    [data-testid="stSidebar"] .stButton > button:hover {
-        background-color: #ffc300;
-        color: #000000;
-    }
-
-    /* ============================= */
-    /* METRIC (ANGKA + JUDUL) */
-    /* ============================= */
-
-    /* Judul metric: Total Kasus HIV, dll */
-    div[data-testid="stMetric"] p {
-        font-size: 21px !important;
-        font-weight: 600 !important;
-    }
-
-    /* Angka metric */
-    div[data-testid="stMetricValue"] {
-        font-size: 45px !important;
-        font-weight: 600 !important;
-    }
-
-    /* ============================= */
-    /* JUDUL DASHBOARD */
-    /* ============================= */
-    .stApp h1 {
-        font-size: 40x !important;
-        font-weight: 800 !important;
-    }
-
-    .stApp h2 {
-        font-size: 28px !important;
-    }
-
-    /* ============================= */
-    /* ISI DASHBOARD */
-    /* ============================= */
-
-    /* Sumber data / caption */
-    .stCaption,
-    div[data-testid="stMarkdown"] span {
-        font-size: 12px !important;
-        color: #6b7280;
-    }
-
-    /* Paragraf markdown */
-    div[data-testid="stMarkdown"] p {
-        font-size: 21px !important;
-        line-height: 1.6;
-    }
-
-    /* Heading markdown (###) */
-    div[data-testid="stMarkdown"] h3 {
-        font-size: 24px !important;
-        font-weight: 600;
-        margin-top: 20px;
-    }
-
-    /* Bullet list */
-    div[data-testid="stMarkdown"] li {
-        font-size: 21px !important;
-        line-height: 1.6;
-    }
-
-    /* ============================= */
-    /* TABEL & DROPDOWN */
-    /* ============================= */
-    .stDataFrame {
-        font-size: 25px !important;
-    }
-
-    .stSelectbox label {
-        font-size: 25px !important;
-    }
-
-</style>
-""", unsafe_allow_html=True)
+# Custom CSS untuk tampilan modern seperti dashboard TBC.
+# CSS statis disajikan sebagai file (static/style.css, lihat .streamlit/config.toml)
+# sehingga browser cukup mengunduhnya sekali dan tiap rerun hanya mengirim tag <link>.
+st.markdown(
+    '<link rel="stylesheet" href="app/static/style.css">',
+    unsafe_allow_html=True
+)
 
 # ==============================
 # SIDEBAR NAVIGATION
@@ -129,23 +33,19 @@ menu = ["Home", "Deskripsi Penyakit", "Karakteristik Wilayah dan Kasus HIV", "Uk
 if "selected" not in st.session_state:
     st.session_state["selected"] = "Home"
 
-# Tombol Home dengan highlight
-if st.sidebar.button("🏠 Home", key="home", use_container_width=True):
-    st.session_state["selected"] = "Home"
+def pilih_menu(item):
+    st.session_state["selected"] = item
 
-# Highlight tombol Home jika aktif
-if st.session_state["selected"] == "Home":
-    st.markdown(
-        """<style>
-            div[data-testid="stSidebar"] div[data-testid="stButton"]:nth-child(1) button {
-                background-color: #ffc300 !important;
-                color: #000 !important;
-                font-weight: 700 !important;
-                border: none !important;
-            }
-        </style>""",
-        unsafe_allow_html=True
-    )
+# Tombol Home dengan highlight (tipe "primary" saat aktif, diwarnai oleh static/style.css).
+# on_click dijalankan sebelum rerun, sehingga highlight langsung sesuai pilihan.
+st.sidebar.button(
+    "🏠 Home",
+    key="home",
+    use_container_width=True,
+    type="primary" if st.session_state["selected"] == "Home" else "secondary",
+    on_click=pilih_menu,
+    args=("Home",)
+)
 
 # Tombol lainnya dengan emoji
 emoji_map = {
@@ -156,339 +56,505 @@ emoji_map = {
 }
 
 for item in menu[1:]:
-    if st.sidebar.button(f"{emoji_map.get(item, '📌')} {item}", key=item, use_container_width=True):
-        st.session_state["selected"] = item
+    st.sidebar.button(
+        f"{emoji_map.get(item, '📌')} {item}",
+        key=item,
+        use_container_width=True,
+        on_click=pilih_menu,
+        args=(item,)
+    )
 
 selected = st.session_state["selected"]
 
+# Telemetri per sesi: durasi bagian halaman & pekerjaan yang dilewati fragment
+catatan = st.session_state.setdefault("telemetri", {})
+telemetry.run_started(catatan)
+
 # ==============================
 # LOAD DATA
 # ==============================
+# Data dibaca dari artifact store bersama (lihat data_store.py). Versi artefak
+# ikut menjadi kunci cache, sehingga worker otomatis memuat ulang data setelah
+# builder menghasilkan versi baru.
+versi_data = data_store.store_version()
+
 @st.cache_data
-def load_data():
-    df = pd.read_csv("data hiv jabar 2024.csv")
-    df.columns = df.columns.str.strip()  # Bersihkan nama kolom
-    # ===== NORMALISASI NAMA KAB/KOTA =====
-    df["KABKOT_MAP"] = (
-        df["Kabupaten/Kota"]
-        .str.upper()
-        .str.replace("KABUPATEN ", "", regex=False)
-        .str.replace("KOTA ", "KOTA ", regex=False)
-    )
-    # Hitung prevalensi jika ada kolom populasi (opsional, jika data punya)
-    if 'Jumlah Penduduk (Ribu)' in df.columns:
-        df['Prevalensi per 100k'] = (df['Jumlah Kasus HIV'] / (df['Jumlah Penduduk (Ribu)'] * 1000)) * 100000
-    return df
+def load_data(versi):
+    return data_store.load_frame("data_2024", versi)
 
 # ==============================
 # LOAD DATA TREN (2018–2024)
 # ==============================
 @st.cache_data
-def load_trend_data():
-    df_trend = pd.read_csv("data tren hiv jabar.csv")
-    df_trend.columns = df_trend.columns.str.strip()
+def load_trend_total(versi):
+    return data_store.load_frame("tren_total", versi)
 
-    df_trend["Tahun"] = df_trend["Tahun"].astype(int)
-    df_trend["Jumlah Kasus"] = pd.to_numeric(
-        df_trend["Jumlah Kasus"], errors="coerce"
-    )
-    df_trend["Kabupaten/Kota"] = df_trend["Kabupaten/Kota"].astype(str)
+# ==============================
+# LAPORAN KUALITAS DATA
+# ==============================
+# Validasi dijalankan sekali per versi dataset oleh builder (validation.py);
+# dashboard hanya membaca laporannya.
+@st.cache_data
+def load_quality_report(versi):
+    return data_store.load_quality_report(versi)
+
+laporan_kualitas = load_quality_report(versi_data)
+badge_kualitas = {
+    "ok": "🟢 Kualitas data: baik",
+    "peringatan": "🟡 Kualitas data: ada peringatan",
+    "error": "🔴 Kualitas data: ada error"
+}
+with st.sidebar.expander(badge_kualitas[laporan_kualitas["status"]]):
+    if not laporan_kualitas["temuan"]:
+        st.write("Semua pemeriksaan lolos.")
+    for t in laporan_kualitas["temuan"]:
+        st.markdown(
+            f"**{t['aturan'].capitalize()}** ({t['dataset']}, {t['tingkat']}): "
+            f"{t['pesan']} — {t['jumlah']} temuan. Contoh: {', '.join(t['contoh'])}"
+        )
 
-    return df_trend
+# ==============================
+# KATALOG STATISTIK
+# ==============================
+# Statistik ringkas sudah dihitung saat ingest (stats_catalog.py), sehingga
+# widget ringkasan cukup melakukan lookup tanpa agregasi pandas.
+@st.cache_data
+def load_stats(versi):
+    return stats_catalog.as_lookup(data_store.load_frame("stats_catalog", versi))
+
+katalog = load_stats(versi_data)
 
-df = load_data()
+def statistik(kolom, tahun=2024, level="provinsi", wilayah=stats_catalog.PROVINSI):
+    return katalog[(level, wilayah, tahun, kolom)]
 
 # ==============================
 # LOAD GEOJSON
 # ==============================
+# Peta hanya menerima batas wilayah yang sedang ditampilkan, diambil dari
+# tile pada tingkat detail yang sesuai (lihat tiles.py)
 @st.cache_data
-def load_geojson():
-    with open("Jabar_By_Kab.geojson", "r", encoding="utf-8") as f:
-        geojson = json.load(f)
-    return geojson
-
-geojson_jabar = load_geojson()
+def load_map_view(kode, versi):
+    return data_store.load_map_view(kode, versi)
 
+# ==============================
+# KUBUS DATA TERSTRATIFIKASI (OPSIONAL)
+# ==============================
+# cache_resource: kubus hanya dibaca, jadi tidak perlu disalin setiap rerun
+@st.cache_resource
+def load_cube(versi):
+    return data_store.load_cube(versi)
 
 # ==============================
-# PAGE CONTENT
+# QUERY (PANDAS / DUCKDB)
 # ==============================
-if selected == "Home":
-    st.title("📊 Dashboard Kasus HIV — Jawa Barat (2024)")
-    st.caption("Sumber data: Dinas Kesehatan Jawa Barat")
+# Backend dipilih di query_engine.py; hasil di-cache per parameter.
+@st.cache_data
+def query_top_k(k, versi):
+    return query_engine.top_k(k, versi)
 
-    # Statistik ringkas dengan font besar
-    total_kasus = int(df["Jumlah Kasus HIV"].sum())
-    rata_rata = int(df["Jumlah Kasus HIV"].mean())
-    median_kasus = int(df["Jumlah Kasus HIV"].median())
-    min_kasus = int(df["Jumlah Kasus HIV"].min())
-    max_kasus = int(df["Jumlah Kasus HIV"].max())
-    range_kasus = f"{min_kasus} – {max_kasus}"
+@st.cache_data
+def query_kabkota(tabel, versi):
+    return query_engine.daftar_kabkota(tabel, versi)
 
-    # 4 kolom metric dengan angka super besar
-    col1, col2, col3 = st.columns(3)
-    col1.metric("Total Kasus HIV (2024)", f"{total_kasus:,}".replace(",", "."))
-    col2.metric("Rata-rata Kasus per Kab/Kota", f"{rata_rata:,}".replace(",", "."))
-    col3.metric("Rentang Kasus", range_kasus)
+@st.cache_data
+def query_tren_semua(versi):
+    return query_engine.tren_semua(versi)
 
-    st.markdown("---")
+@st.cache_data
+def query_tren_kab(kab, versi):
+    return query_engine.tren_kab(kab, versi)
 
-    # Top 10 tabel dengan font besar
-    st.subheader("🔝 10 Kabupaten/Kota dengan Kasus Tertinggi (2024)")
-    df["Prevalensi per 100.000 Penduduk"] = (
-        df["Jumlah Kasus HIV"] / df["Jumlah Penduduk (Ribu)"] * 100
-    ).round(2)
-    df["Jumlah Penduduk"] = (
-        df["Jumlah Penduduk (Ribu)"] * 1000
-    )
-    top10 = df.sort_values("Jumlah Kasus HIV", ascending=False).head(10)
-    st.dataframe(
-        top10[[
-            "Kabupaten/Kota",
-            "Jumlah Kasus HIV",
-            "Jumlah Penduduk",
-            "Prevalensi per 100.000 Penduduk"
-    ]],
-    hide_index=True,
-    use_container_width=True
-    )
+@st.cache_data
+def query_peta(kab, kasus_min, kasus_max, versi):
+    return query_engine.filter_peta(kab, kasus_min, kasus_max, versi)
 
-    st.markdown("---")
+@st.cache_data
+def query_2x2(ambang_kepadatan, versi):
+    return query_engine.tabel_2x2(ambang_kepadatan, versi)
 
-    # Bar chart distribusi dengan judul besar
-    st.subheader("📌 Distribusi Kasus HIV per Kabupaten/Kota")
-    fig_bar = px.bar(
-        df.sort_values("Jumlah Kasus HIV", ascending=False),
-        x="Kabupaten/Kota",
-        y="Jumlah Kasus HIV",
-        labels={"Kabupaten/Kota": "Kabupaten/Kota", "Jumlah Kasus HIV": "Jumlah Kasus"},
-        title="Kasus HIV 2024 per Kabupaten/Kota",
-        color="Jumlah Kasus HIV",
-        color_continuous_scale="Reds"
-    )
-    fig_bar.update_layout(
-        xaxis_tickangle=-45,
-        height=450,
-        title=dict(
-            text="Kasus HIV 2024 per Kabupaten/Kota",
-            x=0.5,
-            xanchor="center",
-            font=dict(size=20)
+# ==============================
+# INTERVAL KEPERCAYAAN PREVALENSI
+# ==============================
+# Dihitung sekaligus untuk semua kab/kota (intervals.py); kunci cache: versi
+# dataset beserta kasus & penduduk (berbeda per strata).
+@st.cache_data
+def load_prevalence_ci(kasus, penduduk, versi):
+    return intervals.prevalence_intervals(kasus, penduduk)
+
+# ==============================
+# EKSPOR DATA
+# ==============================
+# File dibuat saat tombol diklik (lihat exports.py) dan di-memo per tampilan,
+# status filter, format, dan versi dataset, dalam batas byte per proses
+# (exports.export_memo, bukan st.cache_data yang menyimpan salinan pickle
+# setiap file). Frame `df_` tidak ikut di kunci karena isinya sudah
+# ditentukan oleh status filter & versi.
+def export_view(tampilan, status_filter, fmt, versi, df_, kolom=None, index=False):
+    kunci = (tampilan, status_filter, fmt, versi, None if kolom is None else tuple(kolom), index)
+    return exports.export_memo(kunci, df_, fmt, kolom, index)
+
+def tombol_unduh(tampilan, status_filter, df_, kolom=None, index=False):
+    with st.popover("⬇️ Unduh data"):
+        for fmt in exports.formats():
+            ekstensi, mime = exports.FORMAT[fmt]
+            st.download_button(
+                fmt,
+                data=partial(export_view, tampilan, status_filter, fmt, versi_data, df_, kolom, index),
+                file_name=f"{tampilan}{ekstensi}",
+                mime=mime,
+                on_click="ignore",
+                key=f"unduh_{tampilan}_{fmt}"
+            )
+
+# ==============================
+# GRAFIK PRA-RENDER
+# ==============================
+@st.cache_resource
+def load_figure(nama, versi):
+    fig = data_store.load_figure(nama, versi)
+    if fig is not None:
+        return fig
+    # Fallback: artefak belum dibangun, render langsung
+    figures = telemetry.lazy_import("figures")
+    if nama == "fig_bar":
+        return figures.fig_bar_kasus(load_data(versi))
+    if nama == "fig_total":
+        return figures.fig_total_tren(load_trend_total(versi))
+    if nama == "fig_total_rate":
+        return figures.fig_total_tren(load_trend_total(versi), "Rate per 100.000")
+    if nama == "fig_demo":
+        return figures.fig_demografi(load_data(versi))
+    raise KeyError(nama)
+
+
+# ==============================
+# FRAGMENT
+# ==============================
+# Bagian interaktif dijalankan sebagai fragment: perubahan widget di dalamnya
+# hanya menjalankan ulang bagian itu sendiri, bukan seluruh halaman.
+# Durasi dan pekerjaan yang dilewati dicatat oleh telemetry.section.
+@st.fragment
+def bagian_tren():
+    with telemetry.section("tren", catatan):
+        # Ukuran tren: jumlah kasus atau rate dengan penyebut penduduk per tahun (denominators.py)
+        ukuran_tren = st.radio(
+            "Tampilkan:",
+            ["Jumlah Kasus", "Rate per 100.000"],
+            horizontal=True,
+            key="ukuran_tren"
+        )
+        if ukuran_tren == "Rate per 100.000":
+            tahun_anchor = ", ".join(str(t) for t in data_store.population_anchor_years(versi_data))
+            st.caption(
+                f"Penyebut: jumlah penduduk BPS tahun {tahun_anchor}; tahun lainnya hasil "
+                "interpolasi/ekstrapolasi pertumbuhan penduduk (konstan jika hanya ada satu tahun acuan)."
+            )
+            total = load_trend_total(versi_data)
+            tanpa_penyebut = (total["Jumlah Kasus"] - total["Kasus dengan Penyebut"]).sum()
+            if tanpa_penyebut > 0:
+                jumlah = f"{int(tanpa_penyebut):,}".replace(",", ".")
+                st.caption(
+                    f"{jumlah} kasus dari wilayah tanpa data penduduk tidak dihitung "
+                    "dalam rate provinsi (lihat laporan kualitas data)."
+                )
+
+        # ==============================
+        # GRAFIK TOTAL PROVINSI
+        # ==============================
+        fig_total = load_figure(
+            "fig_total" if ukuran_tren == "Jumlah Kasus" else "fig_total_rate",
+            versi_data
         )
-    )    
-    st.plotly_chart(fig_bar, use_container_width=True)
 
-    # ==============================
-    # TREN KASUS HIV PER TAHUN
-    # ==============================
-    st.markdown("---")
-    st.subheader("⏳ Tren Kasus HIV per Tahun (2018–2024)")
+        st.plotly_chart(fig_total, use_container_width=True)
 
-    df_trend = load_trend_data()
+        st.markdown("---")
 
-    # ==============================
-    # GRAFIK TOTAL PROVINSI
-    # ==============================
-    total_per_year = (
-        df_trend
-        .groupby("Tahun", as_index=False)["Jumlah Kasus"]
-        .sum()
-        .sort_values("Tahun")
-    )
+        # ==============================
+        # GRAFIK PER KABUPATEN / KOTA
+        # ==============================
+        st.subheader("📈 Tren Kasus HIV per Kabupaten/Kota")
 
-    fig_total = px.line(
-        total_per_year,
-        x="Tahun",
-        y="Jumlah Kasus",
-        markers=True,
-        title="Total Kasus HIV Provinsi Jawa Barat per Tahun",
-        labels={
-            "Jumlah Kasus": "Jumlah Kasus",
-            "Tahun": "Tahun"
-        }
-    )
+        # ==============================
+        # FILTER KABUPATEN / KOTA
+        # ==============================
+        kabupaten_filter = st.selectbox(
+            "Pilih Kabupaten/Kota:",
+            ["Semua Kabupaten/Kota"] + query_kabkota("tren", versi_data),
+            key="filter_tren_kab"
+        )
+
+        if kabupaten_filter == "Semua Kabupaten/Kota":
+            df_trend = query_tren_semua(versi_data)
+            fig_kab = px.line(
+                df_trend,
+                x="Tahun",
+                y=ukuran_tren,
+                color="Kabupaten/Kota",
+                markers=False,
+                title="Perubahan Kasus HIV per Kabupaten/Kota",
+                labels={
+                    ukuran_tren: ukuran_tren,
+                    "Kabupaten/Kota": "Kabupaten/Kota"
+                }
+            )
+        else:
+            df_kab = query_tren_kab(kabupaten_filter, versi_data)
+
+            fig_kab = px.line(
+                df_kab,
+                x="Tahun",
+                y=ukuran_tren,
+                markers=True,
+                title=f"Tren Kasus HIV — {kabupaten_filter}",
+                labels={
+                    ukuran_tren: ukuran_tren,
+                    "Tahun": "Tahun"
+                }
+            )
 
-    fig_total.update_layout(
-        height=420,
-        title=dict(
-            text="Total Kasus HIV Provinsi Jawa Barat per Tahun",
-            x=0.5,
-            xanchor="center",
-            font=dict(size=20)
-        ),
-        xaxis=dict(dtick=1),
-        yaxis=dict(
-            tickformat=".",
-            title="Jumlah Kasus"
+        if kabupaten_filter == "Semua Kabupaten/Kota":
+            judul = "Perubahan Kasus HIV per Kabupaten/Kota"
+        else:
+            judul = f"Tren Kasus HIV — {kabupaten_filter}"
+
+        fig_kab.update_layout(
+            height=520,
+            title=dict(
+                text=judul,
+                x=0.5,
+                xanchor="center",
+                font=dict(size=20)
+            ),
+            xaxis=dict(dtick=1),
+            legend_title_text="Kabupaten/Kota"
         )
-    )
 
-    st.plotly_chart(fig_total, use_container_width=True)
+        st.plotly_chart(fig_kab, use_container_width=True)
+        tombol_unduh(
+            "tren_kasus_hiv",
+            (kabupaten_filter,),
+            df_trend if kabupaten_filter == "Semua Kabupaten/Kota" else df_kab
+        )
 
-    st.markdown("---")
 
-    # ==============================
-    # GRAFIK PER KABUPATEN / KOTA
-    # ==============================
-    st.subheader("📈 Tren Kasus HIV per Kabupaten/Kota")
+@st.fragment
+def bagian_peta():
+    with telemetry.section("peta", catatan):
+        stat_kasus = statistik("Jumlah Kasus HIV")
+        min_kasus = int(stat_kasus["min"])
+        max_kasus = int(stat_kasus["max"])
 
-    # ==============================
-    # FILTER KABUPATEN / KOTA
-    # ==============================
-    kabupaten_filter = st.selectbox(
-        "Pilih Kabupaten/Kota:",
-        ["Semua Kabupaten/Kota"] + sorted(df_trend["Kabupaten/Kota"].unique()),
-        key="filter_tren_kab"
-    )
+        # ==============================
+        # FILTER
+        # ==============================
+        col1, col2 = st.columns([1, 2])
+
+        with col1:
+            kab_filter = st.selectbox(
+                "Pilih Kabupaten/Kota:",
+                ["Semua Kabupaten/Kota"] + query_kabkota("data_2024", versi_data),
+                key="filter_peta_kab"
+            )
+
+        with col2:
+            kasus_range = st.slider(
+                "Range Jumlah Kasus",
+                min_kasus,
+                max_kasus,
+                (
+                    min_kasus,
+                    max_kasus
+                )
+            )
 
-    if kabupaten_filter == "Semua Kabupaten/Kota":
-        fig_kab = px.line(
-            df_trend,
-            x="Tahun",
-            y="Jumlah Kasus",
-            color="Kabupaten/Kota",
-            markers=False,
-            title="Perubahan Kasus HIV per Kabupaten/Kota",
-            labels={
-                "Jumlah Kasus": "Jumlah Kasus",
-                "Kabupaten/Kota": "Kabupaten/Kota"
-            }
+        # ==============================
+        # APPLY FILTER
+        # ==============================
+        df_map = query_peta(
+            None if kab_filter == "Semua Kabupaten/Kota" else kab_filter,
+            kasus_range[0],
+            kasus_range[1],
+            versi_data
         )
-    else:
-        df_kab = df_trend[df_trend["Kabupaten/Kota"] == kabupaten_filter]
-
-        fig_kab = px.line(
-            df_kab,
-            x="Tahun",
-            y="Jumlah Kasus",
-            markers=True,
-            title=f"Tren Kasus HIV — {kabupaten_filter}",
-            labels={
-                "Jumlah Kasus": "Jumlah Kasus",
-                "Tahun": "Tahun"
-            }
+
+        # ==============================
+        # CHOROPLETH MAP
+        # ==============================
+        geojson = load_map_view(tuple(sorted(df_map["KABKOT_MAP"])), versi_data)
+        fig_map = px.choropleth(
+            df_map,
+            geojson=geojson,
+            locations="KABKOT_MAP",
+            featureidkey="properties.KABKOT",
+            color="Jumlah Kasus HIV",
+            color_continuous_scale="Reds",
+            hover_name="Kabupaten/Kota",
+            custom_data=[
+                "Jumlah Kasus HIV",
+                "_Jumlah_Penduduk_Display",
+                "Kepadatan Penduduk per km persegi (Km2)",
+                "Rasio Jenis Kelamin Penduduk",
+                "Tingkat Pengangguran Terbuka",
+                "Persentase Penduduk Miskin"
+            ]
         )
 
-    if kabupaten_filter == "Semua Kabupaten/Kota":
-        judul = "Perubahan Kasus HIV per Kabupaten/Kota"
-    else:
-        judul = f"Tren Kasus HIV — {kabupaten_filter}"
-
-    fig_kab.update_layout(
-        height=520,
-        title=dict(
-            text=judul,
-            x=0.5,
-            xanchor="center",
-            font=dict(size=20)
-        ),
-        xaxis=dict(dtick=1),
-        legend_title_text="Kabupaten/Kota"
-    )
+        fig_map.update_traces(
+            hovertemplate=
+            "<b>%{hovertext}</b><br><br>"
+            "Jumlah Kasus HIV: %{customdata[0]:,.0f}<br>"
+            "Jumlah Penduduk: %{customdata[1]:,.0f}<br>"
+            "Kepadatan Penduduk: %{customdata[2]:,.0f}<br>"
+            "Rasio Jenis Kelamin Penduduk: %{customdata[3]:.2f}<br>"
+            "Tingkat Pengangguran Terbuka: %{customdata[4]:.2f}%<br>"
+            "Persentase Penduduk Miskin: %{customdata[5]:.2f}%<br>"
+            "<extra></extra>"
+        )
 
-    st.plotly_chart(fig_kab, use_container_width=True)
+        fig_map.update_coloraxes(colorbar_title="Jumlah Kasus")
 
-    # ==============================
-    # PETA INTERAKTIF KASUS HIV JABAR 2024
-    # ==============================
-    st.markdown("---")
-    st.subheader("🗺️ Peta Sebaran Kasus HIV Jawa Barat (2024)")
+        fig_map.update_geos(
+            fitbounds="geojson",
+            visible=False
+        )
 
-    # Load GeoJSON
-    import json
-    with open("Jabar_By_Kab.geojson", "r", encoding="utf-8") as f:
-        geojson = json.load(f)
+        if kab_filter == "Semua Kabupaten/Kota":
+            judul = "Sebaran Kasus HIV 2024 per Kabupaten/Kota"
+        else:
+            judul = f"Sebaran Kasus HIV 2024 — {kab_filter}"
 
-    # ==============================
-    # FILTER
-    # ==============================
-    col1, col2 = st.columns([1, 2])
+        fig_map.update_layout(
+            height=600,
+            margin={"r":0,"t":40,"l":0,"b":0},
+            title=judul,
+            title_font_size=20
+        )
 
-    with col1:
-        kab_filter = st.selectbox(
-            "Pilih Kabupaten/Kota:",
-            ["Semua Kabupaten/Kota"] + sorted(df["Kabupaten/Kota"].unique()),
-            key="filter_peta_kab"
+        st.plotly_chart(fig_map, use_container_width=True)
+        tombol_unduh(
+            "peta_kasus_hiv_2024",
+            (kab_filter, kasus_range[0], kasus_range[1]),
+            df_map,
+            tuple(k for k in df_map.columns if k not in ("KABKOT_MAP", "_Jumlah_Penduduk_Display"))
         )
 
-    with col2:
-        kasus_range = st.slider(
-            "Range Jumlah Kasus",
-            int(df["Jumlah Kasus HIV"].min()),
-            int(df["Jumlah Kasus HIV"].max()),
-            (
-                int(df["Jumlah Kasus HIV"].min()),
-                int(df["Jumlah Kasus HIV"].max())
-            )
+
+@st.fragment
+def bagian_scatter():
+    with telemetry.section("scatter", catatan):
+        variabel = st.selectbox(
+            "Pilih Variabel Karakteristik Wilayah:",
+            ["Jumlah Penduduk (Ribu)", "Kepadatan Penduduk per km persegi (Km2)",
+             "Tingkat Pengangguran Terbuka", "Persentase Penduduk Miskin", "Rasio Jenis Kelamin Penduduk"]
         )
 
-    # ==============================
-    # APPLY FILTER
-    # ==============================
-    df_map = df.copy()
+        fig_scatter = px.scatter(
+            df,
+            x=variabel,
+            y="Jumlah Kasus HIV",
+            text="Kabupaten/Kota",
+            title=f"Jumlah Kasus HIV vs {variabel}",
+            hover_data=["Kabupaten/Kota"]
+        )
+        fig_scatter.update_traces(textposition='top center')
+        fig_scatter.update_layout(title_font_size=30)
+        st.plotly_chart(fig_scatter, use_container_width=True)
+
+
+@st.fragment
+def bagian_ci(df_prev):
+    with telemetry.section("interval", catatan):
+        metode_ci = st.radio(
+            "Metode interval pada grafik",
+            ["Poisson", "Clopper-Pearson", "Bootstrap"],
+            horizontal=True,
+            key="metode_ci"
+        )
+        df_ci = df_prev.sort_values("Prevalensi per 100.000")
+        fig_ci = px.scatter(
+            df_ci,
+            x="Prevalensi per 100.000",
+            y="Kabupaten/Kota",
+            error_x=df_ci[f"{metode_ci} (atas)"] - df_ci["Prevalensi per 100.000"],
+            error_x_minus=df_ci["Prevalensi per 100.000"] - df_ci[f"{metode_ci} (bawah)"],
+            title=f"Prevalensi HIV per 100.000 Penduduk dan IK 95% ({metode_ci})"
+        )
+        fig_ci.update_layout(height=700, yaxis_title=None)
+        st.plotly_chart(fig_ci, use_container_width=True)
+        if metode_ci == "Bootstrap" and df_ci["Bootstrap (bawah)"].isna().any():
+            st.caption(
+                "Bootstrap parametrik tidak memberi interval untuk wilayah tanpa kasus "
+                "(Poisson(0) selalu 0), sehingga wilayah tersebut ditampilkan tanpa "
+                "interval. Gunakan Poisson eksak atau Clopper-Pearson untuk wilayah ini."
+            )
 
-    if kab_filter != "Semua Kabupaten/Kota":
-        df_map = df_map[df_map["Kabupaten/Kota"] == kab_filter]
 
-    df_map = df_map[
-        (df_map["Jumlah Kasus HIV"] >= kasus_range[0]) &
-        (df_map["Jumlah Kasus HIV"] <= kasus_range[1])
-    ]
+# ==============================
+# PAGE CONTENT
+# ==============================
+if selected == "Home":
+    px = telemetry.lazy_import("plotly.express")
 
-    # ==============================
-    # CHOROPLETH MAP
-    # ==============================
-    df_map["_Jumlah_Penduduk_Display"] = df_map["Jumlah Penduduk (Ribu)"] * 1000
-    fig_map = px.choropleth(
-        df_map,
-        geojson=geojson,
-        locations="KABKOT_MAP",
-        featureidkey="properties.KABKOT",
-        color="Jumlah Kasus HIV",
-        color_continuous_scale="Reds",
-        hover_name="Kabupaten/Kota",
-        custom_data=[
+    st.title("📊 Dashboard Kasus HIV — Jawa Barat (2024)")
+    st.caption("Sumber data: Dinas Kesehatan Jawa Barat")
+
+    with telemetry.section("ringkasan", catatan):
+        # Statistik ringkas dengan font besar
+        stat_kasus = statistik("Jumlah Kasus HIV")
+        total_kasus = int(stat_kasus["sum"])
+        rata_rata = int(stat_kasus["mean"])
+        median_kasus = int(stat_kasus["median"])
+        min_kasus = int(stat_kasus["min"])
+        max_kasus = int(stat_kasus["max"])
+        range_kasus = f"{min_kasus} – {max_kasus}"
+
+        # 4 kolom metric dengan angka super besar
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Total Kasus HIV (2024)", f"{total_kasus:,}".replace(",", "."))
+        col2.metric("Rata-rata Kasus per Kab/Kota", f"{rata_rata:,}".replace(",", "."))
+        col3.metric("Rentang Kasus", range_kasus)
+
+        st.markdown("---")
+
+        # Top 10 tabel dengan font besar
+        st.subheader("🔝 10 Kabupaten/Kota dengan Kasus Tertinggi (2024)")
+        top10 = query_top_k(10, versi_data)
+        kolom_top10 = (
+            "Kabupaten/Kota",
             "Jumlah Kasus HIV",
-            "_Jumlah_Penduduk_Display",
-            "Kepadatan Penduduk per km persegi (Km2)",
-            "Rasio Jenis Kelamin Penduduk",
-            "Tingkat Pengangguran Terbuka",
-            "Persentase Penduduk Miskin"
-        ]
-    )
+            "Jumlah Penduduk",
+            "Prevalensi per 100.000 Penduduk"
+        )
+        st.dataframe(
+            top10[list(kolom_top10)],
+        hide_index=True,
+        use_container_width=True
+        )
+        tombol_unduh("top10_kasus_hiv_2024", (10,), top10, kolom_top10)
 
-    fig_map.update_traces(
-        hovertemplate=
-        "<b>%{hovertext}</b><br><br>"
-        "Jumlah Kasus HIV: %{customdata[0]:,.0f}<br>"
-        "Jumlah Penduduk: %{customdata[1]:,.0f}<br>"
-        "Kepadatan Penduduk: %{customdata[2]:,.0f}<br>"
-        "Rasio Jenis Kelamin Penduduk: %{customdata[3]:.2f}<br>"
-        "Tingkat Pengangguran Terbuka: %{customdata[4]:.2f}%<br>"
-        "Persentase Penduduk Miskin: %{customdata[5]:.2f}%<br>"
-        "<extra></extra>"
-    )
+        st.markdown("---")
 
-    fig_map.update_coloraxes(colorbar_title="Jumlah Kasus")
+        # Bar chart distribusi dengan judul besar
+        st.subheader("📌 Distribusi Kasus HIV per Kabupaten/Kota")
+        fig_bar = load_figure("fig_bar", versi_data)
+        st.plotly_chart(fig_bar, use_container_width=True)
 
-    fig_map.update_geos(
-        fitbounds="geojson",
-        visible=False
-    )
+    # ==============================
+    # TREN KASUS HIV PER TAHUN
+    # ==============================
+    st.markdown("---")
+    st.subheader("⏳ Tren Kasus HIV per Tahun (2018–2024)")
 
-    if kab_filter == "Semua Kabupaten/Kota":
-        judul = "Sebaran Kasus HIV 2024 per Kabupaten/Kota"
-    else:
-        judul = f"Sebaran Kasus HIV 2024 — {kab_filter}"
+    bagian_tren()
 
-    fig_map.update_layout(
-        height=600,
-        margin={"r":0,"t":40,"l":0,"b":0},
-        title=judul,
-        title_font_size=20
-    )
+    # ==============================
+    # PETA INTERAKTIF KASUS HIV JABAR 2024
+    # ==============================
+    st.markdown("---")
+    st.subheader("🗺️ Peta Sebaran Kasus HIV Jawa Barat (2024)")
 
-    st.plotly_chart(fig_map, use_container_width=True)
+    bagian_peta()
 
 elif selected == "Deskripsi Penyakit":
     st.title("🧬 Deskripsi Penyakit HIV")
@@ -577,6 +643,10 @@ elif selected == "Deskripsi Penyakit":
     """)
 
 elif selected == "Karakteristik Wilayah dan Kasus HIV":
+    px = telemetry.lazy_import("plotly.express")
+    # Tabel kab/kota lengkap hanya dimuat oleh halaman yang membutuhkan semua kolomnya
+    df = load_data(versi_data)
+
     st.title("🧩 Karakteristik Wilayah dan Kasus HIV")
 
     # ==============================
@@ -597,85 +667,10 @@ elif selected == "Karakteristik Wilayah dan Kasus HIV":
     # ==============================
     st.subheader("📌 Ringkasan Karakteristik Demografi & Sosial-Ekonomi")
 
-    fig_demo = make_subplots(
-        rows=3,
-        cols=2,
-        vertical_spacing=0.25,
-        specs=[
-            [{}, {}],
-            [{}, {}],
-            [{"colspan": 2}, None]
-        ],
-        subplot_titles=[
-            "👥 Jumlah Penduduk (Ribu)",
-            "📍 Kepadatan Penduduk (/km²)",
-            "💼 Tingkat Pengangguran Terbuka (%)",
-            "📉 Persentase Penduduk Miskin (%)",
-            "⚖️ Rasio Jenis Kelamin Penduduk"
-        ]
-    )
-
-    # 1️⃣ Jumlah Penduduk
-    fig_demo.add_trace(
-        go.Bar(
-            x=df["Kabupaten/Kota"],
-            y=df["Jumlah Penduduk (Ribu)"]
-        ),
-        row=1, col=1
-    )
-
-    # 2️⃣ Kepadatan Penduduk
-    fig_demo.add_trace(
-        go.Bar(
-            x=df["Kabupaten/Kota"],
-            y=df["Kepadatan Penduduk per km persegi (Km2)"]
-        ),
-        row=1, col=2
-    )
-
-    # 3️⃣ Pengangguran
-    fig_demo.add_trace(
-        go.Bar(
-            x=df["Kabupaten/Kota"],
-            y=df["Tingkat Pengangguran Terbuka"]
-        ),
-        row=2, col=1
-    )
-
-    # 4️⃣ Kemiskinan
-    fig_demo.add_trace(
-        go.Bar(
-            x=df["Kabupaten/Kota"],
-            y=df["Persentase Penduduk Miskin"]
-        ),
-        row=2, col=2
-    )
-
-    # 5. Rasio Jenis Kelamin
-    fig_demo.add_trace(
-        go.Bar(
-            x=df["Kabupaten/Kota"],
-            y=df["Rasio Jenis Kelamin Penduduk"]
-        ),
-    row=3, col=1
-    )
-
-    # ==============================
-    # LAYOUT
-    # ==============================
-    fig_demo.update_layout(
-        height=1000,
-        showlegend=False,
-        title=dict(
-            text="Indikator Demografi & Sosial-Ekonomi per Kabupaten/Kota",
-            font=dict(size=30)
-        ),
-        margin=dict(t=100)
-    )
-
-    fig_demo.update_xaxes(tickangle=-45)
+    with telemetry.section("demografi", catatan):
+        fig_demo = load_figure("fig_demo", versi_data)
 
-    st.plotly_chart(fig_demo, use_container_width=True)
+        st.plotly_chart(fig_demo, use_container_width=True)
 
     st.markdown("---")
 
@@ -684,23 +679,7 @@ elif selected == "Karakteristik Wilayah dan Kasus HIV":
     # ==============================
     st.subheader("🔍 Hubungan Karakteristik Wilayah dengan Jumlah Kasus HIV")
 
-    variabel = st.selectbox(
-        "Pilih Variabel Karakteristik Wilayah:",
-        ["Jumlah Penduduk (Ribu)", "Kepadatan Penduduk per km persegi (Km2)",
-         "Tingkat Pengangguran Terbuka", "Persentase Penduduk Miskin", "Rasio Jenis Kelamin Penduduk"]
-    )
-
-    fig_scatter = px.scatter(
-        df,
-        x=variabel,
-        y="Jumlah Kasus HIV",
-        text="Kabupaten/Kota",
-        title=f"Jumlah Kasus HIV vs {variabel}",
-        hover_data=["Kabupaten/Kota"]
-    )
-    fig_scatter.update_traces(textposition='top center')
-    fig_scatter.update_layout(title_font_size=30)
-    st.plotly_chart(fig_scatter, use_container_width=True)
+    bagian_scatter()
 
     st.markdown("""
     Pola sebaran titik menunjukkan bahwa **jumlah kasus HIV cenderung meningkat**
@@ -717,36 +696,36 @@ elif selected == "Karakteristik Wilayah dan Kasus HIV":
     # ==============================
     st.subheader("📋 Ringkasan Statistik Variabel Wilayah")
 
-    tabel_ringkas = (
-        df[[
+    with telemetry.section("statistik", catatan):
+        kolom_ringkas = [
             "Jumlah Kasus HIV",
             "Jumlah Penduduk (Ribu)",
             "Kepadatan Penduduk per km persegi (Km2)",
             "Rasio Jenis Kelamin Penduduk",
             "Tingkat Pengangguran Terbuka",
             "Persentase Penduduk Miskin"
-        ]]
-        .agg(["min", "max", "mean"])
-        .T
-        .rename(columns={
-            "min": "Minimum",
-            "max": "Maksimum",
-            "mean": "Rata-rata"
-        })
-        .round(2)
-    )
-
-    st.dataframe(
-        tabel_ringkas,
-        use_container_width=True
-    )
+        ]
+        tabel_ringkas = pd.DataFrame(
+            {
+                "Minimum": [statistik(k)["min"] for k in kolom_ringkas],
+                "Maksimum": [statistik(k)["max"] for k in kolom_ringkas],
+                "Rata-rata": [statistik(k)["mean"] for k in kolom_ringkas]
+            },
+            index=kolom_ringkas
+        ).round(2)
+
+        st.dataframe(
+            tabel_ringkas,
+            use_container_width=True
+        )
 
-    st.caption(
-        "Catatan: Statistik disajikan untuk menggambarkan "
-        "variasi karakteristik wilayah kabupaten/kota sebelum dilakukan analisis pemodelan."
-    )
+        st.caption(
+            "Catatan: Statistik disajikan untuk menggambarkan "
+            "variasi karakteristik wilayah kabupaten/kota sebelum dilakukan analisis pemodelan."
+        )
 
 elif selected == "Ukuran Epidemiologi":
+    df = load_data(versi_data)
     st.title("🔬 Ukuran Epidemiologi")
 
     # ==============================
@@ -763,9 +742,45 @@ elif selected == "Ukuran Epidemiologi":
     st.markdown("**Rumus Prevalensi:**")
     st.latex(r"\text{Prevalensi} = \frac{\text{Jumlah Kasus HIV}}{\text{Populasi}} \times 100.000")
 
+    # --- Stratifikasi (hanya jika data surveilans terstratifikasi tersedia)
+    kubus = load_cube(versi_data)
+    strata = {}
+    dim_strata = [] if kubus is None else [
+        d for d in ["Jenis Kelamin", "Kelompok Umur", "Cara Penularan", "Status ART"]
+        if d in data_cube.dimensions(kubus)
+    ]
+    # Kubus tanpa dimensi strata (hanya wilayah & tahun) tidak punya pilihan
+    if dim_strata:
+        for kol, dim in zip(st.columns(len(dim_strata)), dim_strata):
+            with kol:
+                pilihan = st.selectbox(
+                    dim,
+                    [data_cube.SEMUA] + data_cube.members(kubus, dim),
+                    key=f"strata_{dim}"
+                )
+            if pilihan != data_cube.SEMUA:
+                strata[dim] = pilihan
+
+    # --- Data dasar ukuran epidemiologi (total atau per strata)
+    df_epi = df.copy()
+    df_epi["Jumlah Penduduk"] = df_epi["Jumlah Penduduk (Ribu)"] * 1000
+    penduduk_strata = False
+    if strata:
+        filter_strata = {"Tahun": 2024, **strata}
+        irisan = data_cube.iris(kubus, "Kabupaten/Kota", filter_strata)
+        df_epi["Jumlah Kasus HIV"] = df_epi["Kabupaten/Kota"].map(irisan["Jumlah Kasus"]).fillna(0)
+        penduduk_strata = "Jumlah Penduduk" in irisan.columns and irisan["Jumlah Penduduk"].notna().any()
+        if penduduk_strata:
+            df_epi["Jumlah Penduduk"] = df_epi["Kabupaten/Kota"].map(irisan["Jumlah Penduduk"])
+
     # --- Hitung prevalensi provinsi
-    total_kasus = df["Jumlah Kasus HIV"].sum()
-    total_populasi = (df["Jumlah Penduduk (Ribu)"] * 1000).sum()
+    if strata:
+        sel = data_cube.total(kubus, filter_strata)
+        total_kasus = sel["Jumlah Kasus"]
+        total_populasi = sel["Jumlah Penduduk"] if penduduk_strata else statistik("Jumlah Penduduk (Ribu)")["sum"] * 1000
+    else:
+        total_kasus = statistik("Jumlah Kasus HIV")["sum"]
+        total_populasi = statistik("Jumlah Penduduk (Ribu)")["sum"] * 1000
 
     prevalensi_rasio = total_kasus / total_populasi
     prevalensi_per_100k = prevalensi_rasio * 100000
@@ -784,25 +799,39 @@ elif selected == "Ukuran Epidemiologi":
             f"{prevalensi_persen:.4f}%"
         )
 
-    # --- Prevalensi per kabupaten/kota
-    df_prev = df.copy()
-    df_prev["Jumlah Penduduk"] = df_prev["Jumlah Penduduk (Ribu)"] * 1000
-    df_prev["Prevalensi per 100.000"] = (
-        df_prev["Jumlah Kasus HIV"] / df_prev["Jumlah Penduduk"] * 100000
-    ).round(2)
+    # --- Prevalensi per kabupaten/kota beserta interval kepercayaan 95%
+    df_prev = df_epi[["Kabupaten/Kota", "Jumlah Kasus HIV", "Jumlah Penduduk"]].reset_index(drop=True)
+    ci = load_prevalence_ci(
+        df_prev["Jumlah Kasus HIV"].to_numpy(),
+        df_prev["Jumlah Penduduk"].to_numpy(),
+        versi_data
+    )
+    df_prev = pd.concat([df_prev, ci.round(2)], axis=1)
 
     st.subheader("📊 Prevalensi HIV per Kabupaten/Kota (2024)")
-    st.dataframe(
-        df_prev[[
-            "Kabupaten/Kota",
-            "Jumlah Kasus HIV",
-            "Jumlah Penduduk",
-            "Prevalensi per 100.000"
-        ]],
-        hide_index=True,
-        use_container_width=True
+    st.dataframe(df_prev, hide_index=True, use_container_width=True)
+    st.caption(
+        "Interval kepercayaan 95% per 100.000 penduduk: Poisson eksak, Clopper-Pearson "
+        f"(binomial eksak), dan bootstrap persentil ({intervals.REPLIKASI} replikasi; "
+        "kosong untuk wilayah tanpa kasus)."
     )
 
+    px = telemetry.lazy_import("plotly.express")
+    bagian_ci(df_prev)
+
+    if strata:
+        keterangan = ", ".join(f"{k}: {v}" for k, v in strata.items())
+        if penduduk_strata:
+            st.caption(
+                f"Strata — {keterangan}. Penyebut: jumlah penduduk pada jenis kelamin/kelompok umur "
+                "yang sama; cara penularan dan status ART tidak mempersempit penyebut."
+            )
+        else:
+            st.caption(
+                f"Strata — {keterangan}. Penduduk per strata tidak tersedia, "
+                "sehingga penyebut memakai total penduduk kab/kota."
+            )
+
     st.markdown(f"""
     **Interpretasi:**  
     Prevalensi HIV di Provinsi Jawa Barat tahun 2024 sebesar {prevalensi_per_100k:,.2f} per 100.000 penduduk, atau setara dengan {prevalensi_persen:.4f}% dari total populasi.
@@ -824,18 +853,22 @@ elif selected == "Ukuran Epidemiologi":
     """)
 
     # --- Klasifikasi paparan: kepadatan tinggi vs rendah
-    rata_kepadatan = df["Kepadatan Penduduk per km persegi (Km2)"].mean()
-
-    df_asos = df.copy()
-    df_asos["Paparan"] = df_asos["Kepadatan Penduduk per km persegi (Km2)"] >= rata_kepadatan
-    df_asos["HIV_Pos"] = df_asos["Jumlah Kasus HIV"]
-    df_asos["HIV_Neg"] = (df_asos["Jumlah Penduduk (Ribu)"] * 1000) - df_asos["Jumlah Kasus HIV"]
+    rata_kepadatan = statistik("Kepadatan Penduduk per km persegi (Km2)")["mean"]
 
     # --- Tabel 2x2
-    a = df_asos.loc[df_asos["Paparan"], "HIV_Pos"].sum()
-    b = df_asos.loc[df_asos["Paparan"], "HIV_Neg"].sum()
-    c = df_asos.loc[~df_asos["Paparan"], "HIV_Pos"].sum()
-    d = df_asos.loc[~df_asos["Paparan"], "HIV_Neg"].sum()
+    if strata:
+        # Per strata: kasus & penduduk diambil dari kubus (df_epi), bukan dari query engine
+        df_asos = df_epi.copy()
+        df_asos["Paparan"] = df_asos["Kepadatan Penduduk per km persegi (Km2)"] >= rata_kepadatan
+        df_asos["HIV_Pos"] = df_asos["Jumlah Kasus HIV"]
+        df_asos["HIV_Neg"] = df_asos["Jumlah Penduduk"] - df_asos["Jumlah Kasus HIV"]
+
+        a = df_asos.loc[df_asos["Paparan"], "HIV_Pos"].sum()
+        b = df_asos.loc[df_asos["Paparan"], "HIV_Neg"].sum()
+        c = df_asos.loc[~df_asos["Paparan"], "HIV_Pos"].sum()
+        d = df_asos.loc[~df_asos["Paparan"], "HIV_Neg"].sum()
+    else:
+        a, b, c, d = query_2x2(rata_kepadatan, versi_data)
 
     tabel_2x2 = pd.DataFrame(
         {
@@ -851,10 +884,14 @@ elif selected == "Ukuran Epidemiologi":
 
     st.subheader("📋 Tabel Kontingensi 2×2")
     st.dataframe(tabel_2x2, use_container_width=True)
+    tombol_unduh("tabel_2x2", (rata_kepadatan, tuple(strata.items())), tabel_2x2, index=True)
 
     # --- Hitung PR dan POR
-    PR = (a / (a + b)) / (c / (c + d))
-    POR = (a * d) / (b * c)
+    # Cegah pembagian dengan nol (mis. strata tanpa kasus di salah satu kelompok)
+    PR = (a / (a + b)) / (c / (c + d)) if (a + b) > 0 and c > 0 else float("nan")
+    POR = (a * d) / (b * c) if b * c > 0 else float("nan")
+    if PR != PR or POR != POR:
+        st.warning("PR/POR tidak dapat dihitung karena ada sel tabel 2×2 yang bernilai nol.")
 
     col1, col2 = st.columns(2)
     with col1:
@@ -917,8 +954,4 @@ elif selected == "About Research":
 
     """)
 
-
-
-
-
-
+telemetry.run_finished(catatan)
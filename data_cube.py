@@ -0,0 +1,140 @@
+"""
+Kubus agregat (data cube) untuk data surveilans terstratifikasi.
+
+Data sumber bisa berupa:
+  * data tingkat kasus: satu baris per kasus (tanpa kolom "Jumlah Kasus"), atau
+  * data terstratifikasi: satu baris per strata dengan kolom "Jumlah Kasus",
+    dan opsional "Jumlah Penduduk" (denominator per strata).
+
+Jumlah penduduk hanya terstratifikasi menurut dimensi demografis
+(DIMENSI_PENDUDUK: wilayah, tahun, jenis kelamin, kelompok umur). Cara
+penularan dan status ART adalah atribut kasus, sehingga denominator yang
+diulang pada setiap baris cara penularan/status ART diambil sekali per sel
+demografis, bukan dijumlahkan. Pada rollup, penduduk dijumlahkan hanya atas
+dimensi demografis; sel dengan cara penularan/status ART tertentu memakai
+penduduk irisan demografis yang sama.
+
+Saat ingest, data dibaca per potongan dan diringkas ke cuboid dasar (semua
+dimensi). Setelah itu seluruh kombinasi rollup dimaterialisasi, dengan
+nilai SEMUA untuk dimensi yang dijumlahkan. Irisan apa pun (mis. kab/kota ×
+tahun × jenis kelamin × kelompok umur) lalu dijawab dengan lookup indeks,
+tanpa groupby pada baris mentah.
+"""
+from itertools import combinations
+
+import pandas as pd
+
+DIMENSI = [
+    "Kabupaten/Kota",
+    "Tahun",
+    "Jenis Kelamin",
+    "Kelompok Umur",
+    "Cara Penularan",
+    "Status ART",
+]
+DIMENSI_PENDUDUK = ["Kabupaten/Kota", "Tahun", "Jenis Kelamin", "Kelompok Umur"]
+UKURAN = ["Jumlah Kasus", "Jumlah Penduduk"]
+SEMUA = "Semua"
+
+
+def _ringkas(chunk, dimensi, demografi):
+    """Kasus per cuboid dasar dan penduduk per sel demografis (None jika tidak ada)."""
+    chunk.columns = chunk.columns.str.strip()
+    if "Jumlah Kasus" not in chunk.columns:
+        # Data tingkat kasus: setiap baris = satu kasus
+        chunk = chunk.assign(**{"Jumlah Kasus": 1})
+    chunk[dimensi] = chunk[dimensi].astype(str).apply(lambda s: s.str.strip())
+    chunk["Jumlah Kasus"] = pd.to_numeric(chunk["Jumlah Kasus"], errors="coerce")
+    kasus = chunk.groupby(dimensi, observed=True)[["Jumlah Kasus"]].sum(min_count=1)
+    if "Jumlah Penduduk" not in chunk.columns:
+        return kasus, None
+    chunk["Jumlah Penduduk"] = pd.to_numeric(chunk["Jumlah Penduduk"], errors="coerce")
+    # Denominator yang diulang per cara penularan/status ART diambil sekali per sel
+    penduduk = chunk.groupby(demografi, observed=True)[["Jumlah Penduduk"]].max()
+    return kasus, penduduk
+
+
+def build_cube(chunks):
+    """Bangun kubus dari iterator potongan DataFrame (mis. `pd.read_csv(..., chunksize=...)`)."""
+    dasar = penduduk = None
+    dimensi = demografi = None
+    for chunk in chunks:
+        if dimensi is None:
+            kolom = chunk.columns.str.strip()
+            dimensi = [d for d in DIMENSI if d in kolom]
+            demografi = [d for d in DIMENSI_PENDUDUK if d in dimensi]
+        kasus, pend = _ringkas(chunk, dimensi, demografi)
+        # Cuboid dasar jauh lebih kecil dari data mentah, jadi penggabungan antar potongan murah
+        dasar = kasus if dasar is None else pd.concat([dasar, kasus]).groupby(level=dimensi).sum(min_count=1)
+        if pend is not None:
+            penduduk = pend if penduduk is None else pd.concat([penduduk, pend]).groupby(level=demografi).max()
+
+    dasar = dasar.reset_index()
+    if penduduk is not None:
+        penduduk = penduduk.reset_index()
+    ukuran = ["Jumlah Kasus"] + (["Jumlah Penduduk"] if penduduk is not None else [])
+    cuboid = []
+    for r in range(len(dimensi) + 1):
+        for grup in combinations(dimensi, r):
+            grup = list(grup)
+            if grup:
+                agg = dasar.groupby(grup, observed=True)[["Jumlah Kasus"]].sum(min_count=1).reset_index()
+            else:
+                agg = dasar[["Jumlah Kasus"]].sum(min_count=1).to_frame().T
+            if penduduk is not None:
+                # Penduduk hanya dijumlahkan atas dimensi demografis pada grup ini
+                grup_demo = [d for d in grup if d in demografi]
+                if grup_demo:
+                    pend = penduduk.groupby(grup_demo, observed=True)["Jumlah Penduduk"].sum(min_count=1)
+                    agg = agg.merge(pend.reset_index(), on=grup_demo, how="left")
+                else:
+                    agg["Jumlah Penduduk"] = penduduk["Jumlah Penduduk"].sum(min_count=1)
+            for d in dimensi:
+                if d not in grup:
+                    agg[d] = SEMUA
+            cuboid.append(agg[dimensi + ukuran])
+    return pd.concat(cuboid, ignore_index=True)
+
+
+def as_index(kubus):
+    """Kubus dengan MultiIndex atas seluruh dimensi, siap untuk lookup."""
+    dimensi = [d for d in DIMENSI if d in kubus.columns]
+    return kubus.set_index(dimensi).sort_index()
+
+
+def dimensions(kubus):
+    return list(kubus.index.names)
+
+
+def members(kubus, dimensi):
+    """Anggota sebuah dimensi (tanpa SEMUA)."""
+    nilai = kubus.index.get_level_values(dimensi).unique()
+    return sorted(v for v in nilai if v != SEMUA)
+
+
+def iris(kubus, per, filter_=None):
+    """Irisan kubus: satu baris per anggota dimensi `per`, dimensi lain
+    sesuai dict `filter_` (dimensi yang tidak disebut = SEMUA)."""
+    nama = dimensions(kubus)
+    filter_ = {k: str(v) for k, v in (filter_ or {}).items()}
+    kunci = tuple(
+        slice(None) if d == per else filter_.get(d, SEMUA)
+        for d in nama
+    )
+    try:
+        hasil = kubus.loc[kunci, :]
+    except KeyError:
+        # Kombinasi strata tidak ada di data
+        return pd.DataFrame(columns=kubus.columns, index=pd.Index([], name=per))
+    hasil = hasil.droplevel([d for d in nama if d != per])
+    return hasil.drop(index=SEMUA, errors="ignore")
+
+
+def total(kubus, filter_=None):
+    """Nilai satu sel kubus (dimensi yang tidak disebut = SEMUA)."""
+    filter_ = {k: str(v) for k, v in (filter_ or {}).items()}
+    kunci = tuple(filter_.get(d, SEMUA) for d in dimensions(kubus))
+    try:
+        return kubus.loc[kunci]
+    except KeyError:
+        return pd.Series(0, index=kubus.columns)
@@ -0,0 +1,456 @@
+"""
+Artifact store bersama untuk dashboard HIV Jawa Barat.
+
+Satu proses builder (`python data_store.py`) membaca data mentah, melakukan
+praproses, lalu menulis hasilnya ke satu direktori per versi:
+
+    artifacts/
+        CURRENT                penunjuk versi yang sedang dipakai
+        <versi>/
+            manifest.json          versi dataset + hash file sumber
+            data_2024.parquet      data kab/kota 2024 yang sudah dipraproses
+            tren.parquet           data tren 2018–2024
+            tren_total.parquet     total provinsi per tahun
+            stats_catalog.parquet  katalog statistik ringkas (stats_catalog.py)
+            cube.parquet           kubus agregat data terstratifikasi (data_cube.py),
+                                   hanya jika file data stratifikasi tersedia
+            jabar_kab.geojson      GeoJSON batas kab/kota yang sudah disederhanakan
+            tiles/                 tile multi-resolusi batas wilayah (tiles.py)
+            quality_report.json    laporan validasi kualitas data (validation.py)
+            figures/*.json         grafik statis yang sudah dirender (Plotly JSON)
+
+Semua worker Streamlit hanya membaca direktori ini. Versi baru ditulis ke
+folder sementara, diganti nama menjadi `<versi>/`, lalu file CURRENT diganti
+secara atomik (os.replace). Worker membaca CURRENT sekali per run
+(`store_version()`) dan mengambil setiap file melalui versi tersebut,
+sehingga tidak pernah melihat artefak setengah jadi atau campuran dua versi.
+Builder menyimpan versi sebelumnya agar worker yang masih memakainya tetap
+bisa membaca; versi yang lebih lama dihapus. Jika artefak belum dibangun,
+dashboard tetap berjalan dengan membaca CSV secara langsung.
+"""
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+import data_cube
+import denominators
+import stats_catalog
+import tiles
+import validation
+
+BASE_DIR = Path(__file__).resolve().parent
+
+SUMBER_2024 = BASE_DIR / "data hiv jabar 2024.csv"
+SUMBER_TREN = BASE_DIR / "data tren hiv jabar.csv"
+SUMBER_GEOJSON = BASE_DIR / "Jabar_By_Kab.geojson"
+# Opsional: jumlah penduduk BPS tahun lain (Kabupaten/Kota, Tahun, Jumlah Penduduk (Ribu))
+SUMBER_PENDUDUK = BASE_DIR / "data penduduk jabar.csv"
+# Opsional: data surveilans terstratifikasi (umur, jenis kelamin, cara penularan, status ART)
+SUMBER_STRATA = BASE_DIR / "data stratifikasi hiv jabar.csv"
+
+# Properti GeoJSON yang menjadi kode wilayah untuk join dengan data kasus
+KUNCI_WILAYAH = "KABKOT"
+
+ARTIFACT_DIR = Path(os.environ.get("HIV_ARTIFACT_DIR", BASE_DIR / "artifacts"))
+
+# Naikkan jika isi/format artefak berubah, agar versi ikut berubah
+SKEMA_ARTEFAK = 13
+# File berisi nama direktori versi yang sedang aktif
+PENUNJUK = "CURRENT"
+
+
+# ==============================
+# PRAPROSES
+# ==============================
+def prepare_data(df):
+    df = df.copy()
+    df.columns = df.columns.str.strip()  # Bersihkan nama kolom
+    # ===== NORMALISASI NAMA KAB/KOTA =====
+    df["KABKOT_MAP"] = (
+        df["Kabupaten/Kota"]
+        .str.upper()
+        .str.replace("KABUPATEN ", "", regex=False)
+        .str.replace("KOTA ", "KOTA ", regex=False)
+    )
+    # Hitung prevalensi jika ada kolom populasi (opsional, jika data punya)
+    if 'Jumlah Penduduk (Ribu)' in df.columns:
+        df['Prevalensi per 100k'] = (df['Jumlah Kasus HIV'] / (df['Jumlah Penduduk (Ribu)'] * 1000)) * 100000
+        df["Prevalensi per 100.000 Penduduk"] = (
+            df["Jumlah Kasus HIV"] / df["Jumlah Penduduk (Ribu)"] * 100
+        ).round(2)
+        df["Jumlah Penduduk"] = df["Jumlah Penduduk (Ribu)"] * 1000
+    return df
+
+
+def prepare_trend(df_trend):
+    df_trend = df_trend.copy()
+    df_trend.columns = df_trend.columns.str.strip()
+
+    df_trend["Tahun"] = df_trend["Tahun"].astype(int)
+    df_trend["Jumlah Kasus"] = pd.to_numeric(
+        df_trend["Jumlah Kasus"], errors="coerce"
+    )
+    df_trend["Kabupaten/Kota"] = df_trend["Kabupaten/Kota"].astype(str)
+
+    return df_trend
+
+
+def add_rates(df_trend, tabel_penduduk):
+    """Tambahkan denominator per (kab/kota, tahun) dan rate per 100.000, dihitung sekaligus."""
+    df_trend = df_trend.copy()
+    df_trend["Jumlah Penduduk"] = denominators.population_for(
+        tabel_penduduk, df_trend["Kabupaten/Kota"], df_trend["Tahun"]
+    )
+    df_trend["Rate per 100.000"] = denominators.rate_per_100k(
+        df_trend["Jumlah Kasus"], df_trend["Jumlah Penduduk"]
+    ).round(2)
+    return df_trend
+
+
+def total_per_tahun(df_trend):
+    """Total provinsi per tahun. Rate hanya memakai kasus wilayah yang punya penyebut."""
+    kolom = ["Jumlah Kasus"]
+    if "Jumlah Penduduk" in df_trend.columns:
+        # Kasus wilayah tanpa penduduk (mis. nama tidak cocok) tidak boleh
+        # masuk pembilang rate, karena penduduknya tidak ada di penyebut
+        df_trend = df_trend.assign(**{
+            "Kasus dengan Penyebut": df_trend["Jumlah Kasus"].where(df_trend["Jumlah Penduduk"].notna())
+        })
+        kolom += ["Kasus dengan Penyebut", "Jumlah Penduduk"]
+    total = (
+        df_trend
+        .groupby("Tahun", as_index=False)[kolom]
+        .sum()
+        .sort_values("Tahun")
+    )
+    if "Jumlah Penduduk" in total.columns:
+        total["Rate per 100.000"] = denominators.rate_per_100k(
+            total["Kasus dengan Penyebut"], total["Jumlah Penduduk"]
+        ).round(2)
+    return total
+
+
+def read_data():
+    return prepare_data(pd.read_csv(SUMBER_2024))
+
+
+def read_population_table():
+    df_penduduk = pd.read_csv(SUMBER_PENDUDUK) if SUMBER_PENDUDUK.exists() else None
+    return denominators.build_table(read_data(), df_penduduk)
+
+
+def read_trend():
+    return add_rates(prepare_trend(pd.read_csv(SUMBER_TREN)), read_population_table())
+
+
+def read_stats_catalog(chunksize=100_000):
+    # Dibaca per potongan agar ekstrak besar tidak perlu dimuat sekaligus
+    return stats_catalog.build_catalog(
+        pd.read_csv(SUMBER_2024, chunksize=chunksize),
+        pd.read_csv(SUMBER_TREN, chunksize=chunksize),
+    )
+
+
+def read_cube(chunksize=100_000):
+    return data_cube.build_cube(pd.read_csv(SUMBER_STRATA, chunksize=chunksize))
+
+
+def read_geojson():
+    with open(SUMBER_GEOJSON, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def read_quality_report():
+    kode_geojson = None
+    if SUMBER_GEOJSON.exists():
+        kode_geojson = [f["properties"][KUNCI_WILAYAH] for f in read_geojson()["features"]]
+    df_raw = pd.read_csv(SUMBER_2024)
+    df_trend_raw = pd.read_csv(SUMBER_TREN)
+    try:
+        kode_data = prepare_data(df_raw)["KABKOT_MAP"]
+    except (KeyError, AttributeError):
+        kode_data = None  # skema rusak, dilaporkan oleh validasi skema
+    return validation.validate(df_raw, df_trend_raw, kode_geojson, kode_data)
+
+
+def simplify_geojson(geojson, decimals=4):
+    """Bulatkan koordinat (4 desimal ≈ 11 m) dan buang titik berurutan yang
+    menjadi duplikat setelah pembulatan. Ukuran file turun drastis tanpa
+    perubahan bentuk yang terlihat pada skala provinsi."""
+
+    def ring(coords):
+        hasil = []
+        for x, y in coords:
+            titik = [round(x, decimals), round(y, decimals)]
+            if not hasil or hasil[-1] != titik:
+                hasil.append(titik)
+        # Ring poligon minimal 4 titik (titik awal = titik akhir)
+        return hasil if len(hasil) >= 4 else [[round(x, decimals), round(y, decimals)] for x, y in coords]
+
+    def geometry(geom):
+        if geom is None:
+            return None
+        if geom["type"] == "Polygon":
+            return {"type": "Polygon", "coordinates": [ring(r) for r in geom["coordinates"]]}
+        if geom["type"] == "MultiPolygon":
+            return {
+                "type": "MultiPolygon",
+                "coordinates": [[ring(r) for r in poly] for poly in geom["coordinates"]],
+            }
+        return geom
+
+    return {
+        "type": "FeatureCollection",
+        "features": [
+            {"type": "Feature", "properties": feat.get("properties", {}), "geometry": geometry(feat.get("geometry"))}
+            for feat in geojson["features"]
+        ],
+    }
+
+
+# ==============================
+# BUILDER
+# ==============================
+def _hash_file(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for blok in iter(lambda: f.read(1 << 20), b""):
+            h.update(blok)
+    return h.hexdigest()
+
+
+def build_store(dest=ARTIFACT_DIR):
+    """Bangun seluruh artefak ke `dest/<versi>` lalu jadikan versi aktif.
+    Dijalankan oleh satu proses saja.
+
+    Jika validasi menemukan error, tidak ada yang dibangun atau dipublikasikan
+    (ValueError) dan worker tetap memakai versi aktif sebelumnya."""
+    dest = Path(dest)
+    dest.mkdir(parents=True, exist_ok=True)
+
+    sumber = {
+        p.name: _hash_file(p)
+        for p in (SUMBER_2024, SUMBER_TREN, SUMBER_GEOJSON, SUMBER_STRATA, SUMBER_PENDUDUK)
+        if p.exists()
+    }
+    versi = hashlib.sha256(
+        json.dumps({"skema": SKEMA_ARTEFAK, "sumber": sumber}, sort_keys=True).encode()
+    ).hexdigest()[:12]
+
+    # Versi yang sama sudah pernah dibangun: cukup jadikan versi aktif
+    if (dest / versi / "manifest.json").exists():
+        _publish(dest, versi)
+        return load_manifest(versi, dest)
+
+    # Validasi dijalankan pada data mentah, sebelum praproses
+    laporan = read_quality_report()
+    if laporan["status"] == "error":
+        rincian = "\n".join(
+            f"  - {t['dataset']}: {t['pesan']} ({t['jumlah']} temuan, contoh: {', '.join(t['contoh'])})"
+            for t in laporan["temuan"] if t["tingkat"] == "error"
+        )
+        raise ValueError(f"Validasi data gagal, artefak versi {versi} tidak dipublikasikan:\n{rincian}")
+    tmp = Path(tempfile.mkdtemp(prefix=".build-", dir=dest))
+    tmp.chmod(0o755)  # mkdtemp membuat direktori 0700; worker perlu akses baca
+    try:
+        manifest = _tulis_artefak(tmp, versi, sumber, laporan)
+        # Direktori versi belum dibaca siapa pun, jadi boleh diganti nama langsung
+        os.replace(tmp, dest / versi)
+    except BaseException:
+        # Build gagal/dibatalkan: _publish hanya membersihkan direktori versi
+        # yang lengkap, jadi direktori sementara dihapus di sini
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    _publish(dest, versi)
+    return manifest
+
+
+def _tulis_artefak(tmp, versi, sumber, laporan):
+    """Tulis seluruh artefak satu versi ke direktori `tmp`; kembalikan manifest."""
+    import plotly.io as pio
+    import figures
+
+    df = read_data()
+    df_trend = read_trend()
+    total = total_per_tahun(df_trend)
+
+    df.to_parquet(tmp / "data_2024.parquet", index=False)
+    df_trend.to_parquet(tmp / "tren.parquet", index=False)
+    total.to_parquet(tmp / "tren_total.parquet", index=False)
+    read_stats_catalog().to_parquet(tmp / "stats_catalog.parquet", index=False)
+    if SUMBER_STRATA.exists():
+        read_cube().to_parquet(tmp / "cube.parquet", index=False)
+
+    if SUMBER_GEOJSON.exists():
+        geojson = read_geojson()
+        with open(tmp / "jabar_kab.geojson", "w", encoding="utf-8") as f:
+            json.dump(simplify_geojson(geojson), f, separators=(",", ":"))
+        tiles.build_tiles(geojson, tmp / "tiles", KUNCI_WILAYAH)
+    else:
+        print(f"Peringatan: {SUMBER_GEOJSON.name} tidak ditemukan, GeoJSON tidak dibangun.", file=sys.stderr)
+
+    with open(tmp / "quality_report.json", "w", encoding="utf-8") as f:
+        json.dump(laporan, f, indent=2, ensure_ascii=False)
+
+    (tmp / "figures").mkdir()
+    rendered = {
+        "fig_bar": figures.fig_bar_kasus(df),
+        "fig_total": figures.fig_total_tren(total),
+        "fig_total_rate": figures.fig_total_tren(total, "Rate per 100.000"),
+        "fig_demo": figures.fig_demografi(df),
+    }
+    for nama, fig in rendered.items():
+        (tmp / "figures" / f"{nama}.json").write_text(pio.to_json(fig), encoding="utf-8")
+
+    manifest = {
+        "version": versi,
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "sources": sumber,
+        "quality": laporan["status"],
+        "population_anchor_years": denominators.anchor_years(read_population_table()),
+    }
+    (tmp / "manifest.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return manifest
+
+
+def _publish(dest, versi):
+    """Jadikan `versi` versi aktif dengan mengganti file penunjuk secara atomik,
+    lalu hapus versi yang lebih lama dari versi sebelumnya."""
+    sebelumnya = store_version(dest)
+    fd, tmp = tempfile.mkstemp(prefix=".current-", dir=dest)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(versi)
+    os.chmod(tmp, 0o644)
+    os.replace(tmp, dest / PENUNJUK)
+
+    # Versi sebelumnya disimpan karena mungkin masih dibaca worker yang sedang berjalan
+    for p in dest.iterdir():
+        if p.is_dir() and (p / "manifest.json").exists() and p.name not in (versi, sebelumnya):
+            shutil.rmtree(p, ignore_errors=True)
+
+
+# ==============================
+# READER (DIPAKAI WORKER)
+# ==============================
+# Semua reader menerima `versi` hasil store_version() pada awal run, sehingga
+# setiap file dalam satu run berasal dari versi yang sama. `versi=None`
+# berarti artefak belum dibangun: data dibaca langsung dari sumber.
+def store_version(src=ARTIFACT_DIR):
+    """Versi artefak yang sedang aktif, atau None jika artefak belum dibangun."""
+    try:
+        versi = (Path(src) / PENUNJUK).read_text(encoding="utf-8").strip()
+    except FileNotFoundError:
+        return None
+    return versi if (Path(src) / versi / "manifest.json").exists() else None
+
+
+def _artefak(versi, nama, src=ARTIFACT_DIR):
+    """Path file artefak `nama` pada `versi`, atau None jika tidak tersedia."""
+    if versi is None:
+        return None
+    path = Path(src) / versi / nama
+    return path if path.exists() else None
+
+
+def load_manifest(versi, src=ARTIFACT_DIR):
+    path = _artefak(versi, "manifest.json", src)
+    if path is None:
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def population_anchor_years(versi, src=ARTIFACT_DIR):
+    manifest = load_manifest(versi, src)
+    if manifest and "population_anchor_years" in manifest:
+        return manifest["population_anchor_years"]
+    return denominators.anchor_years(read_population_table())
+
+
+def load_frame(nama, versi, src=ARTIFACT_DIR):
+    path = _artefak(versi, f"{nama}.parquet", src)
+    if path is not None:
+        return pd.read_parquet(path)
+    # Fallback: artefak belum dibangun, praproses langsung dari CSV
+    if nama == "data_2024":
+        return read_data()
+    if nama == "tren":
+        return read_trend()
+    if nama == "tren_total":
+        return total_per_tahun(read_trend())
+    if nama == "stats_catalog":
+        return read_stats_catalog()
+    raise KeyError(nama)
+
+
+def load_cube(versi, src=ARTIFACT_DIR):
+    """Kubus terstratifikasi (terindeks), atau None jika data stratifikasi tidak tersedia."""
+    path = _artefak(versi, "cube.parquet", src)
+    if path is not None:
+        return data_cube.as_index(pd.read_parquet(path))
+    if SUMBER_STRATA.exists():
+        return data_cube.as_index(read_cube())
+    return None
+
+
+def load_geojson(versi, src=ARTIFACT_DIR):
+    path = _artefak(versi, "jabar_kab.geojson", src)
+    if path is not None:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return read_geojson()
+
+
+def load_map_view(kode, versi, src=ARTIFACT_DIR):
+    """GeoJSON yang hanya berisi wilayah `kode`. Jika tile tersedia, fitur
+    diambil dari tile yang menutupi wilayah tersebut pada zoom yang sesuai;
+    jika tidak, dari GeoJSON utuh."""
+    kode = set(kode)
+    dir_tile = _artefak(versi, "tiles", src)
+    index = tiles.load_index(dir_tile) if dir_tile is not None else None
+    if index is None:
+        geojson = load_geojson(versi, src)
+        return {
+            "type": "FeatureCollection",
+            "features": [f for f in geojson["features"] if f["properties"][KUNCI_WILAYAH] in kode],
+        }
+    kotak = [index["bbox"][k] for k in kode if k in index["bbox"]]
+    if not kotak:
+        return {"type": "FeatureCollection", "features": []}
+    view = [
+        min(b[0] for b in kotak), min(b[1] for b in kotak),
+        max(b[2] for b in kotak), max(b[3] for b in kotak),
+    ]
+    return tiles.load_view(dir_tile, index, view, kode)
+
+
+def load_quality_report(versi, src=ARTIFACT_DIR):
+    path = _artefak(versi, "quality_report.json", src)
+    if path is not None:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return read_quality_report()
+
+
+def load_figure(nama, versi, src=ARTIFACT_DIR):
+    """Grafik yang sudah dirender, atau None jika belum ada di artefak."""
+    path = _artefak(versi, f"figures/{nama}.json", src)
+    if path is None:
+        return None
+    import plotly.io as pio
+    return pio.from_json(path.read_text(encoding="utf-8"))
+
+
+if __name__ == "__main__":
+    try:
+        info = build_store()
+    except ValueError as e:
+        sys.exit(str(e))
+    print(f"Artefak versi {info['version']} aktif di {ARTIFACT_DIR} (kualitas data: {info['quality']})")
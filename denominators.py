@@ -0,0 +1,103 @@
+"""
+Layanan denominator jumlah penduduk per wilayah dan tahun.
+
+Titik acuan (anchor) berasal dari data BPS: kolom "Jumlah Penduduk (Ribu)"
+di data 2024, ditambah file opsional berformat panjang
+(Kabupaten/Kota, Tahun, Jumlah Penduduk (Ribu)) untuk tahun-tahun lain.
+
+Tahun di antara dua anchor diisi dengan interpolasi linear pada skala log
+(pertumbuhan eksponensial). Tahun di luar rentang anchor diekstrapolasi
+dengan laju pertumbuhan dari dua anchor terdekat. Jika suatu wilayah hanya
+punya satu anchor, jumlah penduduknya dianggap konstan. Semua perhitungan
+dilakukan sekaligus untuk seluruh wilayah (matriks wilayah × tahun).
+"""
+import numpy as np
+import pandas as pd
+
+KOLOM_WILAYAH = "Kabupaten/Kota"
+
+
+def build_table(df_2024, df_penduduk=None, tahun_2024=2024):
+    """Tabel anchor: index wilayah, kolom tahun, nilai jumlah penduduk (jiwa)."""
+    anchor = [pd.DataFrame({
+        KOLOM_WILAYAH: df_2024[KOLOM_WILAYAH],
+        "Tahun": tahun_2024,
+        "Jumlah Penduduk": df_2024["Jumlah Penduduk (Ribu)"] * 1000,
+    })]
+    if df_penduduk is not None:
+        df_penduduk = df_penduduk.rename(columns=str.strip)
+        anchor.append(pd.DataFrame({
+            KOLOM_WILAYAH: df_penduduk[KOLOM_WILAYAH].astype(str),
+            "Tahun": df_penduduk["Tahun"].astype(int),
+            "Jumlah Penduduk": pd.to_numeric(df_penduduk["Jumlah Penduduk (Ribu)"], errors="coerce") * 1000,
+        }))
+    anchor = pd.concat(anchor, ignore_index=True)
+    anchor = anchor[anchor["Jumlah Penduduk"] > 0]
+    # Data 2024 di urutan pertama: jika tahun yang sama muncul dua kali, data 2024 yang dipakai
+    anchor = anchor.drop_duplicates([KOLOM_WILAYAH, "Tahun"], keep="first")
+    return anchor.pivot(index=KOLOM_WILAYAH, columns="Tahun", values="Jumlah Penduduk").sort_index(axis=1)
+
+
+def anchor_years(tabel):
+    return [int(t) for t in tabel.columns]
+
+
+def _dua_anchor(valid, dari_kiri):
+    """Indeks anchor valid pertama & kedua (dari kiri) atau terakhir & kedua
+    terakhir (dari kanan) per baris; -1 jika tidak ada."""
+    idx = np.arange(valid.shape[1])
+    if not dari_kiri:
+        idx = idx[::-1]
+    jumlah = np.cumsum(valid[:, idx], axis=1)
+    pertama = np.where(jumlah[:, -1] >= 1, idx[np.argmax(jumlah >= 1, axis=1)], -1)
+    kedua = np.where(jumlah[:, -1] >= 2, idx[np.argmax(jumlah >= 2, axis=1)], -1)
+    return pertama, kedua
+
+
+def population_grid(tabel, wilayah, tahun):
+    """Matriks jumlah penduduk berukuran len(wilayah) × len(tahun).
+    Wilayah tanpa anchor menghasilkan NaN."""
+    wilayah = list(wilayah)
+    tahun = np.asarray(list(tahun), dtype=int)
+    log_p = np.log(tabel.reindex(wilayah).to_numpy(dtype=float))
+    th_anchor = np.asarray(anchor_years(tabel), dtype=float)
+    valid = ~np.isnan(log_p)
+
+    # Interpolasi di dalam rentang anchor (per baris, karena anchor tiap wilayah bisa berbeda)
+    semua = np.union1d(th_anchor, tahun).astype(int)
+    lebar = pd.DataFrame(log_p, columns=th_anchor.astype(int)).reindex(columns=semua)
+    dalam = lebar.T.interpolate(method="index", limit_area="inside").T
+    hasil = dalam.reindex(columns=tahun).to_numpy(dtype=float)
+
+    # Ekstrapolasi di luar rentang anchor dengan laju pertumbuhan dua anchor terdekat
+    baris = np.arange(len(wilayah))
+    for dari_kiri in (True, False):
+        i1, i2 = _dua_anchor(valid, dari_kiri)
+        ada = i1 >= 0
+        ada2 = ada & (i2 >= 0)
+        y1 = np.where(ada, th_anchor[np.maximum(i1, 0)], np.nan)
+        v1 = np.where(ada, log_p[baris, np.maximum(i1, 0)], np.nan)
+        y2 = np.where(ada2, th_anchor[np.maximum(i2, 0)], np.nan)
+        v2 = np.where(ada2, log_p[baris, np.maximum(i2, 0)], np.nan)
+        laju = np.where(ada2, (v2 - v1) / np.where(ada2, y2 - y1, 1.0), 0.0)
+        luar = (tahun[None, :] < y1[:, None]) if dari_kiri else (tahun[None, :] > y1[:, None])
+        ekstra = v1[:, None] + laju[:, None] * (tahun[None, :] - y1[:, None])
+        hasil = np.where(luar & ada[:, None], ekstra, hasil)
+
+    return np.exp(hasil)
+
+
+def population_for(tabel, wilayah, tahun):
+    """Jumlah penduduk untuk pasangan (wilayah[i], tahun[i]), sejajar dengan input."""
+    wilayah = np.asarray(wilayah)
+    tahun = np.asarray(tahun, dtype=int)
+    uw, iw = np.unique(wilayah, return_inverse=True)
+    ut, it = np.unique(tahun, return_inverse=True)
+    return population_grid(tabel, uw, ut)[iw, it]
+
+
+def rate_per_100k(kasus, penduduk):
+    kasus = np.asarray(kasus, dtype=float)
+    penduduk = np.asarray(penduduk, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(penduduk > 0, kasus / penduduk * 100000, np.nan)
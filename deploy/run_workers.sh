@@ -0,0 +1,40 @@
+#!/usr/bin/env bash
+# Menjalankan dashboard dalam mode multi-proses:
+#   1. satu proses builder mengisi artifact store (data_store.py)
+#   2. WORKERS proses Streamlit, masing-masing di port sendiri
+#   3. nginx (>= 1.19.5, untuk opsi -e) di port 8501 sebagai load balancer
+#      dengan sticky session; konfigurasinya diperiksa dulu dengan nginx -t
+#
+# Pemakaian:  WORKERS=4 deploy/run_workers.sh
+set -euo pipefail
+
+cd "$(dirname "$0")/.."
+
+WORKERS=${WORKERS:-$(nproc)}
+BASE_PORT=${BASE_PORT:-8601}
+
+python data_store.py
+
+# Secret cookie yang sama untuk semua worker (cookie XSRF/auth tetap valid
+# jika sesi pindah worker, mis. setelah worker di-restart)
+export STREAMLIT_SERVER_COOKIE_SECRET=${STREAMLIT_SERVER_COOKIE_SECRET:-$(python -c 'import secrets; print(secrets.token_hex(32))')}
+
+: > deploy/upstream.conf
+for ((i = 0; i < WORKERS; i++)); do
+    echo "server 127.0.0.1:$((BASE_PORT + i));" >> deploy/upstream.conf
+done
+
+# Periksa konfigurasi nginx (termasuk upstream.conf) sebelum worker dijalankan
+nginx -t -p "$(pwd)/deploy" -c nginx.conf -e stderr
+
+pids=()
+for ((i = 0; i < WORKERS; i++)); do
+    streamlit run dasbotepi.py \
+        --server.port "$((BASE_PORT + i))" \
+        --server.headless true &
+    pids+=($!)
+done
+
+trap 'kill "${pids[@]}" 2>/dev/null' EXIT
+
+nginx -p "$(pwd)/deploy" -c nginx.conf -e stderr -g "daemon off;"
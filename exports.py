@@ -0,0 +1,124 @@
+"""
+Ekspor tampilan data yang sedang difilter (CSV/Parquet/XLSX).
+
+Frame hasil query (dari cache) ditulis per potongan baris langsung ke
+keluaran terkompresi. Hanya satu potongan yang dikonversi pada satu waktu,
+dan kolom dipilih per potongan, sehingga tidak ada salinan utuh frame
+sebelum ditulis:
+  * CSV: teks per potongan ke aliran gzip.
+  * Parquet: satu row group per potongan (pyarrow, kompresi zstd).
+  * XLSX: workbook write-only openpyxl, baris demi baris. openpyxl bersifat
+    opsional; format ini hanya ditawarkan jika terpasang.
+
+Hasil ekspor di-memo per proses (`export_memo`) dengan kunci dari pemanggil
+(tampilan, status filter, format, versi). Memo dibatasi total byte, bukan
+jumlah entri: file di atas MEMO_BYTES_PER_FILE tidak di-memo sama sekali,
+dan entri terlama dibuang bila total melewati MEMO_BYTES_MAKS. Cache hit
+mengembalikan objek bytes yang sama (bukan salinan hasil unpickle seperti
+st.cache_data).
+"""
+import gzip
+import importlib.util
+import io
+import threading
+from collections import OrderedDict
+
+import telemetry
+
+XLSX_TERSEDIA = importlib.util.find_spec("openpyxl") is not None
+BARIS_PER_POTONGAN = 50_000
+# Batas baris satu sheet Excel (termasuk header)
+BARIS_MAKS_XLSX = 1_048_576
+# Batas memo ekspor per proses worker
+MEMO_BYTES_MAKS = 128 * 1024 * 1024
+MEMO_BYTES_PER_FILE = 16 * 1024 * 1024
+
+# format -> (ekstensi file, MIME)
+FORMAT = {
+    "CSV": (".csv.gz", "application/gzip"),
+    "Parquet": (".parquet", "application/vnd.apache.parquet"),
+    "XLSX": (".xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+
+
+def formats():
+    return [f for f in FORMAT if f != "XLSX" or XLSX_TERSEDIA]
+
+
+def _potongan(df, kolom):
+    for i in range(0, max(len(df), 1), BARIS_PER_POTONGAN):
+        yield i == 0, df.iloc[i:i + BARIS_PER_POTONGAN][kolom]
+
+
+def _csv(df, kolom, index, keluaran):
+    # mtime=0: isi file identik untuk data yang sama
+    with gzip.GzipFile(fileobj=keluaran, mode="wb", compresslevel=6, mtime=0) as gz:
+        with io.TextIOWrapper(gz, encoding="utf-8", newline="") as teks:
+            for pertama, bagian in _potongan(df, kolom):
+                bagian.to_csv(teks, header=pertama, index=index)
+
+
+def _parquet(df, kolom, index, keluaran):
+    pa = telemetry.lazy_import("pyarrow")
+    pq = telemetry.lazy_import("pyarrow.parquet")
+    penulis = None
+    for _, bagian in _potongan(df, kolom):
+        batch = pa.RecordBatch.from_pandas(bagian, preserve_index=index)
+        if penulis is None:
+            penulis = pq.ParquetWriter(keluaran, batch.schema, compression="zstd")
+        penulis.write_batch(batch)
+    penulis.close()
+
+
+def _xlsx(df, kolom, index, keluaran):
+    if len(df) + 1 > BARIS_MAKS_XLSX:
+        raise ValueError(f"{len(df)} baris melebihi batas satu sheet XLSX")
+    openpyxl = telemetry.lazy_import("openpyxl")
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("data")
+    ws.append(([df.index.name or ""] if index else []) + [str(k) for k in kolom])
+    for _, bagian in _potongan(df, kolom):
+        # NaN tidak valid di XLSX, jadi ditulis sebagai sel kosong
+        for baris in bagian.astype(object).where(bagian.notna(), None).itertuples(index=index, name=None):
+            ws.append(baris)
+    wb.save(keluaran)
+
+
+PENULIS = {"CSV": _csv, "Parquet": _parquet, "XLSX": _xlsx}
+
+
+def to_bytes(df, fmt, kolom=None, index=False):
+    """Isi file ekspor `df` (hanya kolom `kolom`, default semua) dalam format `fmt`."""
+    if fmt == "XLSX" and not XLSX_TERSEDIA:
+        raise ValueError("Ekspor XLSX membutuhkan openpyxl (pip install openpyxl)")
+    keluaran = io.BytesIO()
+    PENULIS[fmt](df, list(df.columns if kolom is None else kolom), index, keluaran)
+    # getvalue() berbagi buffer BytesIO (tanpa salinan) selama buffer tidak
+    # di-export; `keluaran` dibuang setelah ini
+    return keluaran.getvalue()
+
+
+_memo = OrderedDict()  # kunci -> bytes, urutan LRU
+_memo_bytes = 0
+_kunci_memo = threading.Lock()
+
+
+def export_memo(kunci, df, fmt, kolom=None, index=False):
+    """Seperti to_bytes, tetapi di-memo per `kunci` dalam batas byte (LRU)."""
+    global _memo_bytes
+    with _kunci_memo:
+        isi = _memo.get(kunci)
+        if isi is not None:
+            _memo.move_to_end(kunci)
+            return isi
+    isi = to_bytes(df, fmt, kolom, index)
+    if len(isi) > MEMO_BYTES_PER_FILE:
+        return isi
+    with _kunci_memo:
+        if kunci not in _memo:
+            _memo[kunci] = isi
+            _memo_bytes += len(isi)
+        while _memo_bytes > MEMO_BYTES_MAKS:
+            _, lama = _memo.popitem(last=False)
+            _memo_bytes -= len(lama)
+    return isi
@@ -0,0 +1,150 @@
+import plotly.express as px
+from plotly.subplots import make_subplots
+import plotly.graph_objects as go
+
+# ==============================
+# GRAFIK STATIS (TIDAK BERGANTUNG WIDGET)
+# ==============================
+# Dipakai oleh dashboard maupun builder artefak (data_store.py), sehingga
+# grafik yang sudah dirender di artefak identik dengan grafik di dashboard.
+
+
+def fig_bar_kasus(df):
+    fig_bar = px.bar(
+        df.sort_values("Jumlah Kasus HIV", ascending=False),
+        x="Kabupaten/Kota",
+        y="Jumlah Kasus HIV",
+        labels={"Kabupaten/Kota": "Kabupaten/Kota", "Jumlah Kasus HIV": "Jumlah Kasus"},
+        title="Kasus HIV 2024 per Kabupaten/Kota",
+        color="Jumlah Kasus HIV",
+        color_continuous_scale="Reds"
+    )
+    fig_bar.update_layout(
+        xaxis_tickangle=-45,
+        height=450,
+        title=dict(
+            text="Kasus HIV 2024 per Kabupaten/Kota",
+            x=0.5,
+            xanchor="center",
+            font=dict(size=20)
+        )
+    )
+    return fig_bar
+
+
+def fig_total_tren(total_per_year, kolom="Jumlah Kasus"):
+    if kolom == "Jumlah Kasus":
+        judul = "Total Kasus HIV Provinsi Jawa Barat per Tahun"
+        tickformat = "."
+    else:
+        judul = "Kasus HIV per 100.000 Penduduk — Provinsi Jawa Barat"
+        tickformat = ".1f"
+
+    fig_total = px.line(
+        total_per_year,
+        x="Tahun",
+        y=kolom,
+        markers=True,
+        title=judul,
+        labels={
+            kolom: kolom,
+            "Tahun": "Tahun"
+        }
+    )
+
+    fig_total.update_layout(
+        height=420,
+        title=dict(
+            text=judul,
+            x=0.5,
+            xanchor="center",
+            font=dict(size=20)
+        ),
+        xaxis=dict(dtick=1),
+        yaxis=dict(
+            tickformat=tickformat,
+            title=kolom
+        )
+    )
+    return fig_total
+
+
+def fig_demografi(df):
+    fig_demo = make_subplots(
+        rows=3,
+        cols=2,
+        vertical_spacing=0.25,
+        specs=[
+            [{}, {}],
+            [{}, {}],
+            [{"colspan": 2}, None]
+        ],
+        subplot_titles=[
+            "👥 Jumlah Penduduk (Ribu)",
+            "📍 Kepadatan Penduduk (/km²)",
+            "💼 Tingkat Pengangguran Terbuka (%)",
+            "📉 Persentase Penduduk Miskin (%)",
+            "⚖️ Rasio Jenis Kelamin Penduduk"
+        ]
+    )
+
+    # 1️⃣ Jumlah Penduduk
+    fig_demo.add_trace(
+        go.Bar(
+            x=df["Kabupaten/Kota"],
+            y=df["Jumlah Penduduk (Ribu)"]
+        ),
+        row=1, col=1
+    )
+
+    # 2️⃣ Kepadatan Penduduk
+    fig_demo.add_trace(
+        go.Bar(
+            x=df["Kabupaten/Kota"],
+            y=df["Kepadatan Penduduk per km persegi (Km2)"]
+        ),
+        row=1, col=2
+    )
+
+    # 3️⃣ Pengangguran
+    fig_demo.add_trace(
+        go.Bar(
+            x=df["Kabupaten/Kota"],
+            y=df["Tingkat Pengangguran Terbuka"]
+        ),
+        row=2, col=1
+    )
+
+    # 4️⃣ Kemiskinan
+    fig_demo.add_trace(
+        go.Bar(
+            x=df["Kabupaten/Kota"],
+            y=df["Persentase Penduduk Miskin"]
+        ),
+        row=2, col=2
+    )
+
+    # 5. Rasio Jenis Kelamin
+    fig_demo.add_trace(
+        go.Bar(
+            x=df["Kabupaten/Kota"],
+            y=df["Rasio Jenis Kelamin Penduduk"]
+        ),
+        row=3, col=1
+    )
+
+    # ==============================
+    # LAYOUT
+    # ==============================
+    fig_demo.update_layout(
+        height=1000,
+        showlegend=False,
+        title=dict(
+            text="Indikator Demografi & Sosial-Ekonomi per Kabupaten/Kota",
+            font=dict(size=30)
+        ),
+        margin=dict(t=100)
+    )
+
+    fig_demo.update_xaxes(tickangle=-45)
+    return fig_demo
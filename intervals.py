@@ -0,0 +1,90 @@
+"""
+Interval kepercayaan prevalensi per wilayah.
+
+Tiga metode, semuanya dihitung sekaligus untuk seluruh wilayah (array
+NumPy, tanpa loop per baris):
+  * Poisson eksak (Garwood): batas dari kuantil distribusi chi-kuadrat.
+  * Clopper-Pearson: interval binomial eksak dari kuantil distribusi beta,
+    dengan jumlah penduduk sebagai jumlah percobaan.
+  * Bootstrap parametrik: jumlah kasus disampel ulang dari Poisson(kasus)
+    lalu diambil persentilnya. Data agregat tidak punya catatan individu,
+    sehingga resampling non-parametrik tidak dapat dilakukan. Wilayah tanpa
+    kasus menghasilkan NaN: Poisson(0) selalu bernilai 0, sehingga
+    persentilnya [0, 0] bukan interval yang sah. Sampel dibuat per blok
+    wilayah agar memori tetap terbatas pada ribuan wilayah × ribuan
+    replikasi.
+
+Semua hasil dinyatakan per 100.000 penduduk. Wilayah tanpa penduduk yang
+valid menghasilkan NaN. SciPy baru di-import saat interval pertama kali
+dihitung.
+"""
+import numpy as np
+import pandas as pd
+
+import telemetry
+
+PER = 100000
+ALPHA = 0.05
+REPLIKASI = 2000
+# Batas jumlah sampel bootstrap per blok (wilayah × replikasi)
+UKURAN_BLOK = 2_000_000
+
+
+def _input(kasus, penduduk):
+    kasus = np.round(np.asarray(kasus, dtype=float))
+    penduduk = np.round(np.asarray(penduduk, dtype=float))
+    valid = (penduduk > 0) & (kasus >= 0) & (kasus <= penduduk)
+    return kasus, penduduk, valid
+
+
+def poisson_exact(kasus, penduduk, alpha=ALPHA, per=PER):
+    """Batas bawah & atas interval Poisson eksak untuk laju per `per` penduduk."""
+    chi2 = telemetry.lazy_import("scipy.stats").chi2
+    kasus, penduduk, valid = _input(kasus, penduduk)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        bawah = np.where(kasus > 0, chi2.ppf(alpha / 2, 2 * kasus) / 2, 0.0)
+        atas = chi2.ppf(1 - alpha / 2, 2 * kasus + 2) / 2
+        skala = np.where(valid, per / penduduk, np.nan)
+    return bawah * skala, atas * skala
+
+
+def clopper_pearson(kasus, penduduk, alpha=ALPHA, per=PER):
+    """Batas bawah & atas interval Clopper-Pearson untuk proporsi kasus/penduduk."""
+    beta = telemetry.lazy_import("scipy.stats").beta
+    kasus, penduduk, valid = _input(kasus, penduduk)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        bawah = np.where(kasus > 0, beta.ppf(alpha / 2, kasus, penduduk - kasus + 1), 0.0)
+        atas = np.where(kasus < penduduk, beta.ppf(1 - alpha / 2, kasus + 1, penduduk - kasus), 1.0)
+    return np.where(valid, bawah * per, np.nan), np.where(valid, atas * per, np.nan)
+
+
+def bootstrap(kasus, penduduk, alpha=ALPHA, per=PER, replikasi=REPLIKASI, seed=0):
+    """Batas bawah & atas interval bootstrap persentil (parametrik Poisson); NaN jika kasus = 0."""
+    kasus, penduduk, valid = _input(kasus, penduduk)
+    rng = np.random.default_rng(seed)
+    lam = np.where(valid, kasus, 0.0)
+    batas = np.empty((len(lam), 2))
+    blok = max(1, UKURAN_BLOK // replikasi)
+    for i in range(0, len(lam), blok):
+        sampel = rng.poisson(lam[i:i + blok, None], size=(len(lam[i:i + blok]), replikasi))
+        batas[i:i + blok] = np.quantile(sampel, [alpha / 2, 1 - alpha / 2], axis=1).T
+    with np.errstate(divide="ignore", invalid="ignore"):
+        skala = np.where(valid & (kasus > 0), per / penduduk, np.nan)
+    return batas[:, 0] * skala, batas[:, 1] * skala
+
+
+def prevalence_intervals(kasus, penduduk, alpha=ALPHA, replikasi=REPLIKASI, seed=0):
+    """Tabel prevalensi per 100.000 beserta batas ketiga metode, sejajar dengan input."""
+    kasus = np.asarray(kasus, dtype=float)
+    penduduk = np.asarray(penduduk, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        prevalensi = np.where(penduduk > 0, kasus / penduduk * PER, np.nan)
+    kolom = {"Prevalensi per 100.000": prevalensi}
+    for nama, (bawah, atas) in {
+        "Poisson": poisson_exact(kasus, penduduk, alpha),
+        "Clopper-Pearson": clopper_pearson(kasus, penduduk, alpha),
+        "Bootstrap": bootstrap(kasus, penduduk, alpha, replikasi=replikasi, seed=seed),
+    }.items():
+        kolom[f"{nama} (bawah)"] = bawah
+        kolom[f"{nama} (atas)"] = atas
+    return pd.DataFrame(kolom)
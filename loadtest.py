@@ -0,0 +1,220 @@
+"""
+Load test terhadap deployment multi-worker (deploy/run_workers.sh).
+
+Setiap pengguna simulasi berperilaku seperti browser, lewat nginx:
+  1. GET halaman utama dan menyimpan cookie sticky session dari nginx.
+  2. Membuka websocket /_stcore/stream dengan cookie tersebut, menjalankan
+     skrip (BackMsg rerun_script), mengganti filter tren dan filter peta
+     (rerun fragment), lalu membuka halaman Karakteristik Wilayah dan
+     Ukuran Epidemiologi lewat tombol sidebar.
+  3. Memutus websocket lalu menyambung ulang dengan session id yang sama.
+     Sesi hanya bisa dilanjutkan oleh worker yang menyimpannya, jadi
+     reconnect yang mendapat session id baru berarti sticky session gagal.
+
+Untuk setiap jumlah pengguna serentak dilaporkan: sesi selesai, sesi gagal
+(exception di skrip atau koneksi putus), reconnect yang tidak sticky,
+interaksi per detik, dan latensi interaksi (p50/p95).
+
+Skalabilitas terhadap jumlah worker: load test hanya melihat deployment dari
+luar, jadi deployment dijalankan ulang dengan WORKERS berbeda dan hasil
+setiap putaran ditambahkan ke satu file (--hasil). Setelah setiap putaran
+dicetak ringkasan skalabilitas dari seluruh isi file: throughput per jumlah
+worker, speedup terhadap jumlah worker terkecil di file (biasanya 1), dan
+efisiensi (speedup dibagi kelipatan jumlah worker). Skalabilitas mendekati
+linear berarti efisiensi mendekati 1. Jumlah core harus minimal sama dengan
+jumlah worker terbesar, dan jumlah pengguna serentak harus cukup untuk
+menjenuhkan semua worker.
+
+Pemakaian (sapuan 1, 2, 4 worker):
+    rm -f loadtest.jsonl
+    for w in 1 2 4; do
+        WORKERS=$w deploy/run_workers.sh &
+        sleep 30   # builder + worker siap
+        python loadtest.py --users 4 16 32 --duration 30 --workers $w --hasil loadtest.jsonl
+        kill %1; wait
+    done
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import urllib.request
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from websockets.asyncio.client import connect
+
+WIDGET = ("button", "selectbox", "radio", "slider")
+
+
+class Sesi:
+    """Satu pengguna simulasi: satu websocket ke dashboard lewat load balancer."""
+
+    def __init__(self, url, cookie):
+        self.url_ws = url.replace("http", "ws", 1).rstrip("/") + "/_stcore/stream"
+        self.cookie = cookie
+        self.ws = None
+        self.session_id = None
+        self.widget = {}  # key -> (id, opsi, fragment_id)
+        self.nilai = {}  # id -> WidgetState terakhir yang dikirim
+        self.latensi = []
+        self.exception = 0
+
+    async def buka(self, session_id=None):
+        protokol = ["streamlit", "xsrf", session_id] if session_id else ["streamlit"]
+        self.ws = await connect(
+            self.url_ws,
+            subprotocols=protokol,
+            additional_headers={"Cookie": self.cookie} if self.cookie else None,
+            max_size=None,
+        )
+
+    async def tutup(self):
+        await self.ws.close()
+
+    async def rerun(self, ubah=None, fragment_id=""):
+        """Kirim rerun dengan status widget saat ini (+ `ubah`), tunggu script_finished."""
+        msg = BackMsg()
+        msg.rerun_script.query_string = ""
+        msg.rerun_script.page_script_hash = ""
+        msg.rerun_script.fragment_id = fragment_id
+        for state in self.nilai.values():
+            msg.rerun_script.widget_states.widgets.add().CopyFrom(state)
+        if ubah is not None:
+            msg.rerun_script.widget_states.widgets.add().CopyFrom(ubah)
+        mulai = time.perf_counter()
+        await self.ws.send(msg.SerializeToString())
+        while True:
+            fm = ForwardMsg()
+            fm.ParseFromString(await self.ws.recv())
+            jenis = fm.WhichOneof("type")
+            if jenis == "new_session":
+                self.session_id = fm.new_session.initialize.session_id
+            elif jenis == "delta" and fm.delta.WhichOneof("type") == "new_element":
+                el = fm.delta.new_element
+                tipe = el.WhichOneof("type")
+                if tipe == "exception":
+                    self.exception += 1
+                elif tipe in WIDGET:
+                    w = getattr(el, tipe)
+                    key = w.id.split("-", 2)[-1]
+                    opsi = list(w.options) if tipe in ("selectbox", "radio") else []
+                    self.widget[key] = (w.id, opsi, fm.delta.fragment_id)
+            elif jenis == "script_finished":
+                break
+        self.latensi.append((time.perf_counter() - mulai) * 1000)
+
+    async def pilih(self, key, indeks):
+        id_, opsi, fragment_id = self.widget[key]
+        state = BackMsg().rerun_script.widget_states.widgets.add()
+        state.id = id_
+        state.string_value = opsi[indeks]
+        self.nilai[id_] = state
+        await self.rerun(fragment_id=fragment_id)
+
+    async def klik(self, key):
+        state = BackMsg().rerun_script.widget_states.widgets.add()
+        state.id = self.widget[key][0]
+        state.trigger_value = True
+        await self.rerun(ubah=state)
+
+
+def ambil_cookie(url):
+    """GET halaman utama seperti browser; kembalikan cookie dari load balancer."""
+    with urllib.request.urlopen(url, timeout=30) as resp:
+        resp.read()
+        cookie = [c.split(";", 1)[0] for c in resp.headers.get_all("Set-Cookie") or []]
+    return "; ".join(cookie)
+
+
+async def sesi_simulasi(url):
+    """Satu sesi pengguna. Kembalikan (latensi interaksi, sesi gagal, reconnect tidak sticky)."""
+    sesi = Sesi(url, await asyncio.to_thread(ambil_cookie, url))
+    try:
+        await sesi.buka()
+        await sesi.rerun()
+        await sesi.pilih("filter_tren_kab", 1)
+        await sesi.pilih("filter_peta_kab", 1)
+        await sesi.klik("Karakteristik Wilayah dan Kasus HIV")
+        await sesi.klik("Ukuran Epidemiologi")
+        session_id = sesi.session_id
+        await sesi.tutup()
+
+        await sesi.buka(session_id)
+        await sesi.rerun()
+        await sesi.tutup()
+    except Exception as e:  # koneksi ditolak/putus (OSError, ConnectionClosed), widget tidak muncul
+        print(f"  sesi gagal: {e!r}")
+        return sesi.latensi, True, False
+    return sesi.latensi, sesi.exception > 0, sesi.session_id != session_id
+
+
+async def pengguna(url, batas, hasil):
+    while time.perf_counter() < batas:
+        hasil.append(await sesi_simulasi(url))
+
+
+async def jalankan(url, n_pengguna, durasi):
+    hasil = []
+    batas = time.perf_counter() + durasi
+    await asyncio.gather(*(pengguna(url, batas, hasil) for _ in range(n_pengguna)))
+    return hasil
+
+
+def ringkasan_skala(path):
+    """Cetak throughput, speedup, dan efisiensi per jumlah worker dari file hasil (JSON lines)."""
+    hasil = {}
+    with open(path, encoding="utf-8") as f:
+        for baris in f:
+            r = json.loads(baris)
+            hasil[(r["users"], r["workers"])] = r  # putaran terakhir menang
+    print(f"Skalabilitas ({path})")
+    print(f"{'user':>5} {'worker':>7} {'interaksi/dtk':>14} {'speedup':>8} {'efisiensi':>10}")
+    for users in sorted({u for u, _ in hasil}):
+        baris = sorted((w, r) for (u, w), r in hasil.items() if u == users)
+        w0, r0 = baris[0]
+        for w, r in baris:
+            speedup = r["interaksi_per_detik"] / r0["interaksi_per_detik"] if r0["interaksi_per_detik"] else float("nan")
+            print(f"{users:>5} {w:>7} {r['interaksi_per_detik']:>14.2f} {speedup:>8.2f} {speedup / (w / w0):>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8501", help="alamat load balancer (nginx)")
+    parser.add_argument("--users", type=int, nargs="+", default=[1, 4, 16], help="jumlah pengguna serentak")
+    parser.add_argument("--duration", type=float, default=20.0, help="detik per konfigurasi")
+    parser.add_argument("--workers", type=int, help="jumlah worker deployment yang diuji (wajib dengan --hasil)")
+    parser.add_argument("--hasil", help="file JSON lines tempat hasil ditambahkan untuk ringkasan skalabilitas")
+    args = parser.parse_args()
+    if args.hasil and args.workers is None:
+        parser.error("--hasil membutuhkan --workers")
+
+    # Pemanasan: cache data & grafik di worker terisi sebelum pengukuran
+    asyncio.run(sesi_simulasi(args.url))
+
+    print(f"{'user':>5} {'sesi':>6} {'gagal':>6} {'!sticky':>8} {'interaksi/dtk':>14} {'p50 ms':>8} {'p95 ms':>8}")
+    for n in sorted(set(args.users)):
+        mulai = time.perf_counter()
+        hasil = asyncio.run(jalankan(args.url, n, args.duration))
+        lama = time.perf_counter() - mulai
+        latensi = sorted(ms for lat, _, _ in hasil for ms in lat)
+        gagal = sum(1 for _, g, _ in hasil if g)
+        tidak_sticky = sum(1 for _, _, t in hasil if t)
+        p50 = statistics.median(latensi) if latensi else float("nan")
+        p95 = latensi[int(0.95 * (len(latensi) - 1))] if latensi else float("nan")
+        print(f"{n:>5} {len(hasil):>6} {gagal:>6} {tidak_sticky:>8} {len(latensi) / lama:>14.2f} {p50:>8.1f} {p95:>8.1f}")
+        if args.hasil:
+            with open(args.hasil, "a", encoding="utf-8") as f:
+                f.write(json.dumps({
+                    "workers": args.workers, "users": n, "sesi": len(hasil), "gagal": gagal,
+                    "tidak_sticky": tidak_sticky, "interaksi_per_detik": len(latensi) / lama,
+                    "p50_ms": p50, "p95_ms": p95,
+                }) + "\n")
+
+    if args.hasil:
+        ringkasan_skala(args.hasil)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""
+Backend query untuk agregasi dashboard (top-k, filter peta, tren per
+kab/kota, tabel 2×2).
+
+Dua backend dengan antarmuka yang sama:
+  * "pandas" (default): operasi pandas pada frame dari artifact store.
+  * "duckdb": query SQL berparameter langsung ke file Parquet di artifact
+    store. Hanya kolom dan baris yang dibutuhkan yang dibaca, sehingga
+    ekstrak besar tidak perlu dimuat utuh ke memori pandas.
+
+Pilih backend dengan env `HIV_QUERY_BACKEND=duckdb`. DuckDB bersifat
+opsional (`pip install duckdb`); jika tidak terpasang atau artefak Parquet
+belum dibangun (`python data_store.py`), backend otomatis kembali ke pandas.
+
+Koneksi DuckDB disimpan dalam pool per versi artefak, bukan per thread
+(Streamlit membuat thread baru untuk setiap siklus rerun). Setiap koneksi
+di pool menjalankan PREPARE untuk semua query satu kali saat dibuat;
+setelah itu query cukup dijalankan dengan EXECUTE sehingga rencana query
+dipakai ulang lintas rerun dan sesi. Pool versi lama dilepas begitu versi
+baru dipakai. Hasil query di-cache per parameter oleh pemanggil
+(st.cache_data di dasbotepi.py).
+"""
+import importlib.util
+import math
+import os
+import threading
+from functools import lru_cache
+
+import data_store
+import telemetry
+
+# Backend opsional; modulnya baru di-import saat koneksi pertama dibuat
+DUCKDB_TERSEDIA = importlib.util.find_spec("duckdb") is not None
+
+KOLOM_TOP = [
+    "Kabupaten/Kota",
+    "Jumlah Kasus HIV",
+    "Jumlah Penduduk",
+    "Prevalensi per 100.000 Penduduk"
+]
+
+QUERIES = {
+    "top_k": """
+        SELECT "Kabupaten/Kota", "Jumlah Kasus HIV", "Jumlah Penduduk", "Prevalensi per 100.000 Penduduk"
+        FROM data_2024
+        ORDER BY "Jumlah Kasus HIV" DESC
+        LIMIT $1
+    """,
+    "filter_peta": """
+        SELECT *, "Jumlah Penduduk (Ribu)" * 1000 AS "_Jumlah_Penduduk_Display"
+        FROM data_2024
+        WHERE ($1::VARCHAR IS NULL OR "Kabupaten/Kota" = $1)
+          AND "Jumlah Kasus HIV" BETWEEN $2 AND $3
+    """,
+    "kabkota_2024": """
+        SELECT DISTINCT "Kabupaten/Kota" FROM data_2024 ORDER BY 1
+    """,
+    "kabkota_tren": """
+        SELECT DISTINCT "Kabupaten/Kota" FROM tren ORDER BY 1
+    """,
+    "tren_semua": """
+        SELECT *
+        FROM tren
+        ORDER BY "Kabupaten/Kota", "Tahun"
+    """,
+    "tren_kab": """
+        SELECT *
+        FROM tren
+        WHERE "Kabupaten/Kota" = $1
+        ORDER BY "Tahun"
+    """,
+    "tabel_2x2": """
+        SELECT
+            "Kepadatan Penduduk per km persegi (Km2)" >= $1 AS paparan,
+            SUM("Jumlah Kasus HIV") AS hiv_pos,
+            SUM("Jumlah Penduduk (Ribu)" * 1000 - "Jumlah Kasus HIV") AS hiv_neg
+        FROM data_2024
+        GROUP BY 1
+    """,
+}
+
+
+def backend(versi):
+    pilihan = os.environ.get("HIV_QUERY_BACKEND", "pandas").lower()
+    if pilihan == "duckdb" and DUCKDB_TERSEDIA and versi is not None:
+        return "duckdb"
+    return "pandas"
+
+
+# ==============================
+# BACKEND DUCKDB
+# ==============================
+_kunci_db = threading.Lock()
+# versi -> (database, koneksi bebas yang sudah di-PREPARE)
+_pool = {}
+
+
+def _literal(nilai):
+    """Literal SQL untuk argumen EXECUTE (DuckDB tidak menerima parameter
+    terikat pada EXECUTE)."""
+    if nilai is None:
+        return "NULL"
+    if isinstance(nilai, bool):
+        return "TRUE" if nilai else "FALSE"
+    if isinstance(nilai, (int, float)):
+        if not math.isfinite(nilai):
+            raise ValueError(f"nilai tidak valid: {nilai!r}")
+        return repr(nilai)
+    return "'" + str(nilai).replace("'", "''") + "'"
+
+
+def _ambil(versi):
+    """Ambil koneksi bebas dari pool `versi`; buat dan PREPARE jika pool kosong."""
+    with _kunci_db:
+        if versi not in _pool:
+            # Versi lama dilepas; koneksinya ditutup saat dikembalikan (_kembalikan)
+            _pool.clear()
+            db = telemetry.lazy_import("duckdb").connect()
+            for nama in ("data_2024", "tren"):
+                path = (data_store.ARTIFACT_DIR / versi / f"{nama}.parquet").as_posix().replace("'", "''")
+                db.execute(f"CREATE VIEW {nama} AS SELECT * FROM read_parquet('{path}')")
+            _pool[versi] = (db, [])
+        db, bebas = _pool[versi]
+        if bebas:
+            return bebas.pop()
+        con = db.cursor()
+    for nama, sql in QUERIES.items():
+        con.execute(f"PREPARE {nama} AS {sql}")
+    telemetry.logger.info("duckdb: koneksi baru untuk versi %s, %d query di-PREPARE", versi, len(QUERIES))
+    return con
+
+
+def _kembalikan(versi, con):
+    with _kunci_db:
+        if versi in _pool:
+            _pool[versi][1].append(con)
+            return
+    con.close()
+
+
+def _execute(versi, nama, *params):
+    con = _ambil(versi)
+    try:
+        args = f"({', '.join(_literal(p) for p in params)})" if params else ""
+        return con.execute(f"EXECUTE {nama}{args}").df()
+    finally:
+        _kembalikan(versi, con)
+
+
+# ==============================
+# BACKEND PANDAS
+# ==============================
+@lru_cache(maxsize=4)
+def _frame(nama, versi):
+    return data_store.load_frame(nama, versi)
+
+
+# ==============================
+# API
+# ==============================
+def top_k(k=10, versi=None):
+    if backend(versi) == "duckdb":
+        return _execute(versi, "top_k", int(k))
+    df = _frame("data_2024", versi)
+    return df.nlargest(k, "Jumlah Kasus HIV")[KOLOM_TOP]
+
+
+def filter_peta(kab=None, kasus_min=None, kasus_max=None, versi=None):
+    """Baris data 2024 untuk peta; `kab=None` berarti semua kab/kota."""
+    kasus_min = -math.inf if kasus_min is None else kasus_min
+    kasus_max = math.inf if kasus_max is None else kasus_max
+    if backend(versi) == "duckdb":
+        return _execute(
+            versi, "filter_peta", kab,
+            kasus_min if math.isfinite(kasus_min) else -1e308,
+            kasus_max if math.isfinite(kasus_max) else 1e308,
+        )
+    df = _frame("data_2024", versi)
+    mask = df["Jumlah Kasus HIV"].between(kasus_min, kasus_max)
+    if kab is not None:
+        mask &= df["Kabupaten/Kota"] == kab
+    df_map = df[mask].copy()
+    df_map["_Jumlah_Penduduk_Display"] = df_map["Jumlah Penduduk (Ribu)"] * 1000
+    return df_map
+
+
+def daftar_kabkota(tabel="data_2024", versi=None):
+    """Nama kab/kota unik (terurut) pada tabel `data_2024` atau `tren`."""
+    if backend(versi) == "duckdb":
+        query = {"data_2024": "kabkota_2024", "tren": "kabkota_tren"}[tabel]
+        return _execute(versi, query)["Kabupaten/Kota"].tolist()
+    return sorted(_frame(tabel, versi)["Kabupaten/Kota"].unique())
+
+
+def tren_semua(versi=None):
+    """Seri tren seluruh kab/kota, terurut per kab/kota dan tahun."""
+    if backend(versi) == "duckdb":
+        return _execute(versi, "tren_semua")
+    return _frame("tren", versi).sort_values(["Kabupaten/Kota", "Tahun"])
+
+
+def tren_kab(kab, versi=None):
+    if backend(versi) == "duckdb":
+        return _execute(versi, "tren_kab", kab)
+    df_trend = _frame("tren", versi)
+    return df_trend[df_trend["Kabupaten/Kota"] == kab].sort_values("Tahun")
+
+
+def tabel_2x2(ambang_kepadatan, versi=None):
+    """Jumlah sel (a, b, c, d) tabel kontingensi kepadatan tinggi/rendah × HIV."""
+    if backend(versi) == "duckdb":
+        hasil = _execute(versi, "tabel_2x2", float(ambang_kepadatan)).set_index("paparan")
+    else:
+        df = _frame("data_2024", versi)
+        hasil = (
+            df.assign(
+                paparan=df["Kepadatan Penduduk per km persegi (Km2)"] >= ambang_kepadatan,
+                hiv_pos=df["Jumlah Kasus HIV"],
+                hiv_neg=df["Jumlah Penduduk (Ribu)"] * 1000 - df["Jumlah Kasus HIV"],
+            )
+            .groupby("paparan")[["hiv_pos", "hiv_neg"]]
+            .sum()
+        )
+    hasil = hasil.reindex([True, False], fill_value=0)
+    a, b = hasil.loc[True, "hiv_pos"], hasil.loc[True, "hiv_neg"]
+    c, d = hasil.loc[False, "hiv_pos"], hasil.loc[False, "hiv_neg"]
+    return a, b, c, d
@@ -0,0 +1,177 @@
+"""
+Katalog statistik ringkas yang dihitung sekali saat ingest.
+
+Untuk setiap kolom numerik, per tingkat wilayah (provinsi / kab-kota) dan
+per tahun, katalog menyimpan: count, sum, min, max, mean, var, kuantil
+(q25, median, q75) dan rata-rata tertimbang jumlah penduduk.
+
+Momen dihitung secara streaming: data dibaca per potongan (chunk), setiap
+potongan diringkas secara vektor, lalu digabung dengan rumus paralel Chan
+et al. sehingga mean dan varians tetap stabil secara numerik tanpa perlu
+memuat seluruh ekstrak sekaligus.
+
+Kuantil memakai sketsa yang juga bisa digabung: per kunci disimpan paling
+banyak SKETSA centroid (nilai rata-rata, bobot). Setiap penggabungan
+mengurutkan centroid dan memampatkan kunci yang melebihi batas menjadi
+SKETSA ember berbobot sama. Selama suatu kunci punya paling banyak SKETSA
+nilai, kuantilnya eksak (identik dengan interpolasi linear pandas); di atas
+itu galat peringkatnya sekitar 1/SKETSA. Memori sketsa terbatas pada
+jumlah kunci × SKETSA, tidak bergantung pada ukuran ekstrak.
+"""
+import numpy as np
+import pandas as pd
+
+KUNCI = ["level", "wilayah", "tahun", "kolom"]
+PROVINSI = "Jawa Barat"
+KUANTIL = {"q25": 0.25, "median": 0.5, "q75": 0.75}
+# Jumlah centroid maksimum per kunci pada sketsa kuantil
+SKETSA = 200
+
+KOLOM_2024 = [
+    "Jumlah Kasus HIV",
+    "Jumlah Penduduk (Ribu)",
+    "Kepadatan Penduduk per km persegi (Km2)",
+    "Rasio Jenis Kelamin Penduduk",
+    "Tingkat Pengangguran Terbuka",
+    "Persentase Penduduk Miskin",
+]
+KOLOM_TREN = ["Jumlah Kasus"]
+BOBOT = "Jumlah Penduduk (Ribu)"
+
+
+def _long(chunk, kolom, tahun=None, bobot=None):
+    """Ubah potongan data lebar menjadi format panjang untuk dua tingkat wilayah."""
+    tahun_s = chunk["Tahun"] if tahun is None else pd.Series(tahun, index=chunk.index)
+    bobot_s = chunk[bobot] if bobot in chunk.columns else pd.Series(np.nan, index=chunk.index)
+    bagian = []
+    for nama in kolom:
+        nilai = pd.to_numeric(chunk[nama], errors="coerce")
+        basis = pd.DataFrame({
+            "tahun": tahun_s.astype(int).to_numpy(),
+            "kolom": nama,
+            "nilai": nilai.to_numpy(dtype=float),
+            "bobot": bobot_s.to_numpy(dtype=float),
+        })
+        bagian.append(basis.assign(level="kabkota", wilayah=chunk["Kabupaten/Kota"].astype(str).to_numpy()))
+        bagian.append(basis.assign(level="provinsi", wilayah=PROVINSI))
+    long = pd.concat(bagian, ignore_index=True)
+    return long[long["nilai"].notna()]
+
+
+def _ringkas(long):
+    """Statistik cukup (sufficient statistics) satu potongan."""
+    long = long.assign(
+        wx=long["nilai"] * long["bobot"],
+        w=long["bobot"].where(long["bobot"].notna() & long["nilai"].notna()),
+    )
+    g = long.groupby(KUNCI, sort=False)
+    state = g["nilai"].agg(n="count", mean="mean", sum="sum", min="min", max="max")
+    state["m2"] = g["nilai"].var(ddof=0) * state["n"]
+    state["wx"] = g["wx"].sum(min_count=1)
+    state["w"] = g["w"].sum(min_count=1)
+    return state
+
+
+def _gabung(a, b):
+    """Gabungkan dua state dengan rumus paralel Chan (vektor, tanpa loop per grup)."""
+    if a is None:
+        return b
+    idx = a.index.union(b.index)
+    a = a.reindex(idx)
+    b = b.reindex(idx)
+    na = a["n"].fillna(0)
+    nb = b["n"].fillna(0)
+    n = na + nb
+    delta = b["mean"].fillna(0) - a["mean"].fillna(0)
+    out = pd.DataFrame(index=idx)
+    out["n"] = n
+    out["mean"] = a["mean"].fillna(0) + delta * (nb / n)
+    out["sum"] = a["sum"].fillna(0) + b["sum"].fillna(0)
+    out["min"] = np.fmin(a["min"], b["min"])
+    out["max"] = np.fmax(a["max"], b["max"])
+    out["m2"] = a["m2"].fillna(0) + b["m2"].fillna(0) + delta ** 2 * na * nb / n
+    out["wx"] = a["wx"].add(b["wx"], fill_value=0)
+    out["w"] = a["w"].add(b["w"], fill_value=0)
+    return out
+
+
+def _gabung_sketsa(a, b):
+    """Gabungkan dua sketsa kuantil (kolom KUNCI, nilai, n) lalu mampatkan
+    kunci yang memiliki lebih dari SKETSA centroid."""
+    s = b if a is None else pd.concat([a, b], ignore_index=True)
+    s = s.sort_values(KUNCI + ["nilai"], ignore_index=True)
+    g = s.groupby(KUNCI, sort=False)["n"]
+    total = g.transform("sum")
+    sebelum = g.cumsum() - s["n"]
+    # Kunci yang masih kecil dipertahankan apa adanya (satu centroid per baris)
+    ember = np.where(
+        g.transform("size") > SKETSA,
+        np.floor(sebelum / total * SKETSA),
+        g.cumcount(),
+    )
+    s = s.assign(ember=ember, wx=s["nilai"] * s["n"])
+    out = s.groupby(KUNCI + ["ember"], sort=False).agg(wx=("wx", "sum"), n=("n", "sum"))
+    out["nilai"] = out["wx"] / out["n"]
+    return out.reset_index()[KUNCI + ["nilai", "n"]]
+
+
+def _kuantil(sketsa):
+    """Kuantil per kunci dari sketsa, dengan interpolasi linear antar centroid.
+    Semua kunci dihitung sekaligus: posisi centroid diberi offset per kunci
+    sehingga satu searchsorted cukup untuk seluruh katalog."""
+    s = sketsa.sort_values(KUNCI + ["nilai"], ignore_index=True)
+    g = s.groupby(KUNCI, sort=False)["n"]
+    # Posisi centroid pada urutan 0..n-1; untuk bobot 1 sama dengan indeks barisnya
+    posisi = (g.cumsum() - s["n"] + (s["n"] - 1) / 2).to_numpy()
+    ukuran = g.size().to_numpy()
+    total = g.sum().to_numpy()
+    awal = np.concatenate([[0], np.cumsum(ukuran)[:-1]])
+    offset = np.concatenate([[0.0], np.cumsum(total)[:-1]])
+    posisi_global = posisi + np.repeat(offset, ukuran)
+    nilai = s["nilai"].to_numpy()
+
+    hasil = pd.DataFrame(index=pd.MultiIndex.from_frame(s.loc[awal, KUNCI]))
+    for nama, q in KUANTIL.items():
+        target = offset + q * (total - 1)
+        idx = np.searchsorted(posisi_global, target, side="right")
+        hi = np.clip(idx, awal, awal + ukuran - 1)
+        lo = np.clip(idx - 1, awal, awal + ukuran - 1)
+        jarak = posisi_global[hi] - posisi_global[lo]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            frac = np.where(jarak > 0, (target - posisi_global[lo]) / jarak, 0.0)
+        hasil[nama] = nilai[lo] + np.clip(frac, 0, 1) * (nilai[hi] - nilai[lo])
+    return hasil
+
+
+def build_catalog(chunks_2024, chunks_tren, tahun_2024=2024):
+    """Bangun katalog dari iterator potongan DataFrame (mis. `pd.read_csv(..., chunksize=...)`)."""
+    state = None
+    sketsa = None
+    for chunk in chunks_2024:
+        chunk.columns = chunk.columns.str.strip()
+        long = _long(chunk, KOLOM_2024, tahun=tahun_2024, bobot=BOBOT)
+        state = _gabung(state, _ringkas(long))
+        sketsa = _gabung_sketsa(sketsa, long[KUNCI + ["nilai"]].assign(n=1.0))
+    for chunk in chunks_tren:
+        chunk.columns = chunk.columns.str.strip()
+        long = _long(chunk, KOLOM_TREN, bobot=BOBOT)
+        state = _gabung(state, _ringkas(long))
+        sketsa = _gabung_sketsa(sketsa, long[KUNCI + ["nilai"]].assign(n=1.0))
+
+    katalog = pd.DataFrame({
+        "count": state["n"].astype(int),
+        "sum": state["sum"],
+        "min": state["min"],
+        "max": state["max"],
+        "mean": state["mean"],
+        # Varians sampel (ddof=1), sama seperti pandas .var()
+        "var": (state["m2"] / (state["n"] - 1)).where(state["n"] > 1),
+        "mean_tertimbang": state["wx"] / state["w"],
+    })
+    return katalog.join(_kuantil(sketsa)).reset_index()
+
+
+def as_lookup(katalog):
+    """Katalog sebagai dict {(level, wilayah, tahun, kolom): {statistik: nilai}} untuk lookup O(1)."""
+    rows = katalog.set_index(KUNCI).to_dict(orient="index")
+    return {tuple(k): v for k, v in rows.items()}
@@ -0,0 +1,100 @@
+"""
+Instrumentasi ringan untuk dashboard.
+
+Mencatat durasi import modul berat yang dimuat secara lazy (hanya oleh
+halaman yang membutuhkannya), durasi tiap bagian halaman, dan pekerjaan
+yang dilewati ketika hanya satu fragment yang dijalankan ulang. Keluaran
+ditulis ke logger "dasbotepi.telemetry"; set env `HIV_TELEMETRY=1` untuk
+menampilkannya di konsol.
+"""
+import importlib
+import logging
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger("dasbotepi.telemetry")
+if os.environ.get("HIV_TELEMETRY") and not logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(asctime)s [telemetry] %(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+# Durasi import per modul (ms) untuk proses ini
+_import_ms = {}
+
+
+def lazy_import(nama):
+    """Import modul saat pertama kali dibutuhkan dan catat durasinya."""
+    if nama in sys.modules:
+        return sys.modules[nama]
+    mulai = time.perf_counter()
+    modul = importlib.import_module(nama)
+    ms = (time.perf_counter() - mulai) * 1000
+    _import_ms[nama] = ms
+    logger.info("import %s: %.1f ms", nama, ms)
+    return modul
+
+
+def import_report():
+    """Ringkasan durasi import lazy di proses ini, dari yang paling lambat."""
+    return dict(sorted(_import_ms.items(), key=lambda kv: kv[1], reverse=True))
+
+
+# ==============================
+# BAGIAN HALAMAN & FRAGMENT
+# ==============================
+# `catatan` adalah dict milik satu sesi (st.session_state["telemetri"]).
+# Setiap run penuh menaikkan nomor run. Bagian yang dijalankan dua kali dalam
+# nomor run yang sama berarti dijalankan ulang sendirian sebagai fragment;
+# bagian lain di halaman itu dilewati, dan durasi terakhirnya dicatat sebagai
+# pekerjaan yang dihemat.
+
+
+def run_started(catatan):
+    catatan["run"] = catatan.get("run", 0) + 1
+    catatan["bagian_run"] = []
+    catatan.setdefault("durasi", {})
+    catatan.setdefault("dijalankan", {})
+    catatan.setdefault("total_dijalankan_ms", 0.0)
+    catatan.setdefault("total_dilewati_ms", 0.0)
+
+
+@contextmanager
+def section(nama, catatan):
+    """Ukur durasi satu bagian halaman dan catat pekerjaan yang dilewati
+    saat bagian ini dijalankan ulang sebagai fragment."""
+    rerun_fragment = catatan["dijalankan"].get(nama) == catatan["run"]
+    mulai = time.perf_counter()
+    try:
+        yield
+    finally:
+        ms = (time.perf_counter() - mulai) * 1000
+        catatan["durasi"][nama] = ms
+        catatan["dijalankan"][nama] = catatan["run"]
+        catatan["total_dijalankan_ms"] += ms
+        if rerun_fragment:
+            dilewati = {
+                k: catatan["durasi"][k]
+                for k in catatan["bagian_run"]
+                if k != nama and k in catatan["durasi"]
+            }
+            catatan["total_dilewati_ms"] += sum(dilewati.values())
+            logger.info(
+                "fragment %s: %.1f ms dijalankan, ±%.1f ms dilewati (%s)",
+                nama, ms, sum(dilewati.values()), ", ".join(dilewati) or "-",
+            )
+        else:
+            catatan["bagian_run"].append(nama)
+            logger.info("bagian %s: %.1f ms", nama, ms)
+
+
+def run_finished(catatan):
+    total = sum(catatan["durasi"][k] for k in catatan["bagian_run"])
+    logger.info(
+        "run %d: %.1f ms (%s); kumulatif sesi: %.1f ms dijalankan, %.1f ms dihemat oleh fragment",
+        catatan["run"], total, ", ".join(catatan["bagian_run"]) or "-",
+        catatan["total_dijalankan_ms"], catatan["total_dilewati_ms"],
+    )
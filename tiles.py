@@ -0,0 +1,241 @@
+"""
+Pipeline tile vektor offline untuk peta batas wilayah.
+
+Build: GeoJSON batas wilayah (kab/kota, kecamatan, atau desa/kelurahan)
+dipecah menjadi tile XYZ (skema Web Mercator) pada beberapa tingkat zoom.
+Di setiap zoom, geometri disederhanakan dengan Douglas–Peucker sesuai
+ukuran satu piksel dan koordinatnya dikuantisasi, sehingga tile zoom rendah
+kecil dan tile zoom tinggi tetap detail:
+
+    tiles/
+        index.json             zoom, kunci wilayah, bbox & zoom maksimum per fitur
+        {z}/{x}/{y}.geojson    fitur yang memotong tile tersebut
+
+Fitur tidak dipotong di batas tile (potongan akan tampak sebagai garis batas
+palsu di choropleth), jadi fitur yang memotong beberapa tile disalin ke
+setiap tile tersebut. Agar jumlah salinan tidak meledak di zoom tinggi,
+sebuah fitur hanya disimpan sampai zoom tertinggi di mana ia memotong
+paling banyak MAKS_SALINAN tile; pada zoom itu satu piksel toleransi sudah
+jauh lebih halus dari ukuran fitur di layar. Saat dimuat, setiap fitur
+diambil dari zoom min(zoom tampilan, zoom maksimum fitur), cukup dari satu
+tile yang memuatnya. Total salinan per fitur paling banyak
+MAKS_SALINAN × jumlah zoom, berapa pun resolusi GeoJSON sumbernya.
+
+Pipeline ini hanya build: dashboard membaca tile langsung dari artifact
+store (data_store.load_map_view), tanpa server tile.
+
+Pemakaian (tanpa koneksi internet):
+    python tiles.py build Jabar_By_Kab.geojson artifacts/tiles --key KABKOT
+"""
+import argparse
+import json
+import math
+import shutil
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+
+ZOOMS = (7, 9, 11, 13)
+TILE_PX = 256
+MAKS_TILE = 16  # batas jumlah tile per tampilan saat memilih zoom
+MAKS_SALINAN = 4  # batas jumlah tile yang menyimpan satu fitur pada satu zoom
+
+
+# ==============================
+# GEOMETRI
+# ==============================
+def tile_xy(lon, lat, z):
+    n = 2 ** z
+    lat = max(min(lat, 85.0511), -85.0511)
+    x = int((lon + 180.0) / 360.0 * n)
+    y = int((1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def tiles_for_bbox(bbox, z):
+    minx, miny, maxx, maxy = bbox
+    x0, y0 = tile_xy(minx, maxy, z)
+    x1, y1 = tile_xy(maxx, miny, z)
+    return [(x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)]
+
+
+def toleransi(z):
+    """Lebar satu piksel (derajat) pada zoom z."""
+    return 360.0 / (TILE_PX * 2 ** z)
+
+
+def douglas_peucker(titik, tol):
+    """Penyederhanaan garis Douglas–Peucker (iteratif, jarak dihitung vektor)."""
+    titik = np.asarray(titik, dtype=float)
+    if len(titik) <= 4:
+        return titik
+    simpan = np.zeros(len(titik), dtype=bool)
+    simpan[0] = simpan[-1] = True
+    tumpukan = [(0, len(titik) - 1)]
+    while tumpukan:
+        i, j = tumpukan.pop()
+        if j <= i + 1:
+            continue
+        a, b = titik[i], titik[j]
+        seg = titik[i + 1:j]
+        ab = b - a
+        panjang = math.hypot(*ab)
+        if panjang == 0:
+            jarak = np.hypot(*(seg - a).T)
+        else:
+            jarak = np.abs(ab[0] * (seg[:, 1] - a[1]) - ab[1] * (seg[:, 0] - a[0])) / panjang
+        k = int(np.argmax(jarak))
+        if jarak[k] > tol:
+            m = i + 1 + k
+            simpan[m] = True
+            tumpukan.append((i, m))
+            tumpukan.append((m, j))
+    return titik[simpan]
+
+
+def _ring_minimal(titik):
+    """Ring valid terkecil: titik awal, titik terjauh darinya, dan titik terjauh dari garis keduanya."""
+    a = titik[0]
+    p = int(np.argmax(np.hypot(*(titik - a).T)))
+    ab = titik[p] - a
+    q = int(np.argmax(np.abs(ab[0] * (titik[:, 1] - a[1]) - ab[1] * (titik[:, 0] - a[0]))))
+    return titik[sorted({0, p, q, len(titik) - 1})]
+
+
+def _ring(coords, tol, desimal):
+    hasil = douglas_peucker(coords, tol)
+    if len(hasil) < 4:
+        # Ring lebih kecil dari toleransi zoom ini: cukup segitiga dari titik
+        # ekstremnya, jangan kembali ke resolusi penuh
+        hasil = _ring_minimal(np.asarray(coords, dtype=float))
+    return np.round(hasil, desimal).tolist()
+
+
+def simplify(geom, z):
+    tol = toleransi(z)
+    desimal = max(0, math.ceil(-math.log10(tol)) + 1)
+    if geom["type"] == "Polygon":
+        return {"type": "Polygon", "coordinates": [_ring(r, tol, desimal) for r in geom["coordinates"]]}
+    if geom["type"] == "MultiPolygon":
+        return {
+            "type": "MultiPolygon",
+            "coordinates": [[_ring(r, tol, desimal) for r in poly] for poly in geom["coordinates"]],
+        }
+    return geom
+
+
+def bbox(geom):
+    coords = geom["coordinates"]
+    if geom["type"] == "Polygon":
+        coords = [coords]
+    semua = np.concatenate([np.asarray(r, dtype=float) for poly in coords for r in poly])
+    return [*semua.min(axis=0).tolist(), *semua.max(axis=0).tolist()]
+
+
+# ==============================
+# BUILD
+# ==============================
+def build_tiles(geojson, dest, key, zooms=ZOOMS):
+    dest = Path(dest)
+    shutil.rmtree(dest, ignore_errors=True)
+    dest.mkdir(parents=True)
+
+    fitur = [f for f in geojson["features"] if f.get("geometry")]
+    kotak = {f["properties"][key]: bbox(f["geometry"]) for f in fitur}
+    zoom_maks = {}
+    for z in zooms:
+        isi = defaultdict(list)
+        for f in fitur:
+            kode = f["properties"][key]
+            xy = tiles_for_bbox(kotak[kode], z)
+            # Zoom terendah selalu disimpan agar setiap fitur punya setidaknya satu tingkat
+            if z != zooms[0] and len(xy) > MAKS_SALINAN:
+                continue
+            zoom_maks[kode] = z
+            sederhana = {"type": "Feature", "properties": f["properties"], "geometry": simplify(f["geometry"], z)}
+            for t in xy:
+                isi[t].append(sederhana)
+        for (x, y), daftar in isi.items():
+            path = dest / str(z) / str(x) / f"{y}.geojson"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as fh:
+                json.dump({"type": "FeatureCollection", "features": daftar}, fh, separators=(",", ":"))
+
+    semua = np.array(list(kotak.values()))
+    index = {
+        "key": key,
+        "zooms": list(zooms),
+        "bounds": [*semua[:, :2].min(axis=0).tolist(), *semua[:, 2:].max(axis=0).tolist()],
+        "bbox": kotak,
+        "zoom_maks": zoom_maks,
+    }
+    with open(dest / "index.json", "w", encoding="utf-8") as fh:
+        json.dump(index, fh, separators=(",", ":"))
+    return index
+
+
+# ==============================
+# LOAD (SISI DASHBOARD)
+# ==============================
+def load_index(src):
+    path = Path(src) / "index.json"
+    if not path.exists():
+        return None
+    with open(path, "r", encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def zoom_for_bbox(index, view):
+    """Zoom paling detail yang masih memuat `view` dalam MAKS_TILE tile."""
+    pilih = index["zooms"][0]
+    for z in index["zooms"]:
+        if len(tiles_for_bbox(view, z)) <= MAKS_TILE:
+            pilih = z
+    return pilih
+
+
+def load_view(src, index, view, kode=None):
+    """GeoJSON untuk area `view` (minx, miny, maxx, maxy) dari tile pada zoom
+    yang sesuai. Jika `kode` diberikan, hanya fitur dengan kode tersebut yang
+    dikembalikan (join dengan data kasus dilakukan berdasarkan kode wilayah)."""
+    z = zoom_for_bbox(index, view)
+    key = index["key"]
+    minx, miny, maxx, maxy = view
+    dipilih = [
+        k for k, (x0, y0, x1, y1) in index["bbox"].items()
+        if (kode is None or k in kode) and x0 <= maxx and x1 >= minx and y0 <= maxy and y1 >= miny
+    ]
+    fitur = {}
+    dibaca = {}
+    for k in dipilih:
+        # Fitur utuh: satu tile yang memuatnya pada zoom yang tersedia sudah cukup
+        zf = min(z, index["zoom_maks"][k])
+        x, y = tiles_for_bbox(index["bbox"][k], zf)[0]
+        path = Path(src) / str(zf) / str(x) / f"{y}.geojson"
+        if path not in dibaca:
+            with open(path, "r", encoding="utf-8") as fh:
+                dibaca[path] = {f["properties"][key]: f for f in json.load(fh)["features"]}
+        fitur[k] = dibaca[path][k]
+    return {"type": "FeatureCollection", "features": list(fitur.values())}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pipeline tile vektor offline")
+    sub = parser.add_subparsers(dest="perintah", required=True)
+
+    p_build = sub.add_parser("build", help="bangun tile dari GeoJSON")
+    p_build.add_argument("src")
+    p_build.add_argument("dest")
+    p_build.add_argument("--key", default="KABKOT", help="properti kode wilayah untuk join data")
+    p_build.add_argument("--zooms", type=int, nargs="+", default=list(ZOOMS))
+
+    args = parser.parse_args()
+    with open(args.src, "r", encoding="utf-8") as fh:
+        geojson = json.load(fh)
+    index = build_tiles(geojson, args.dest, args.key, tuple(args.zooms))
+    print(f"{len(index['bbox'])} fitur ditulis ke {args.dest}")
+
+
+if __name__ == "__main__":
+    main()
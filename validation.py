@@ -0,0 +1,205 @@
+"""
+Validasi kualitas data saat ingest.
+
+Semua aturan dijalankan sebagai operasi kolom (vektor) pada data mentah,
+sekali per versi dataset oleh builder artefak. Hasilnya berupa laporan
+kualitas yang disimpan di artifact store dan ditampilkan sebagai badge di
+sidebar dashboard. Temuan tingkat "error" membuat builder menolak
+mempublikasikan versi baru (data_store.build_store).
+
+Setiap temuan berisi: aturan, dataset, tingkat ("error" atau "peringatan"),
+jumlah baris yang terdampak, dan beberapa contoh nilai.
+"""
+import pandas as pd
+
+KOLOM_WAJIB = {
+    "data 2024": [
+        "Kabupaten/Kota",
+        "Jumlah Kasus HIV",
+        "Jumlah Penduduk (Ribu)",
+        "Kepadatan Penduduk per km persegi (Km2)",
+        "Rasio Jenis Kelamin Penduduk",
+        "Tingkat Pengangguran Terbuka",
+        "Persentase Penduduk Miskin",
+    ],
+    "data tren": ["Kabupaten/Kota", "Jumlah Kasus", "Tahun"],
+}
+
+# (kolom, batas bawah, batas atas, inklusif bawah)
+RENTANG = {
+    "data 2024": [
+        ("Jumlah Kasus HIV", 0, None, True),
+        ("Jumlah Penduduk (Ribu)", 0, None, False),
+        ("Kepadatan Penduduk per km persegi (Km2)", 0, None, False),
+        ("Rasio Jenis Kelamin Penduduk", 80, 130, True),
+        ("Tingkat Pengangguran Terbuka", 0, 100, True),
+        ("Persentase Penduduk Miskin", 0, 100, True),
+    ],
+    "data tren": [
+        ("Jumlah Kasus", 0, None, True),
+        ("Tahun", 1980, 2100, True),
+    ],
+}
+
+# Kolom yang wajib berisi bilangan bulat tanpa nilai kosong (dipakai sebagai
+# kunci/indeks saat praproses, misalnya Tahun di-cast ke int)
+BULAT = {
+    "data 2024": [],
+    "data tren": ["Tahun"],
+}
+
+MAKS_CONTOH = 5
+
+
+def _temuan(aturan, dataset, tingkat, mask_atau_nilai, pesan):
+    nilai = list(mask_atau_nilai)
+    return {
+        "aturan": aturan,
+        "dataset": dataset,
+        "tingkat": tingkat,
+        "jumlah": len(nilai),
+        "pesan": pesan,
+        "contoh": [str(v) for v in nilai[:MAKS_CONTOH]],
+    }
+
+
+def check_schema(df, dataset):
+    hilang = [k for k in KOLOM_WAJIB[dataset] if k not in df.columns]
+    if hilang:
+        return [_temuan("skema", dataset, "error", hilang, "Kolom wajib tidak ditemukan")]
+    return []
+
+
+def check_numeric(df, dataset):
+    temuan = []
+    for kolom, *_ in RENTANG[dataset]:
+        asli = df[kolom]
+        angka = pd.to_numeric(asli, errors="coerce")
+        gagal = angka.isna() & asli.notna()
+        kosong = asli.isna()
+        if gagal.any():
+            temuan.append(_temuan(
+                "tipe numerik", dataset, "error", asli[gagal].astype(str),
+                f"Nilai '{kolom}' tidak dapat dibaca sebagai angka (akan menjadi kosong)",
+            ))
+        if kosong.any():
+            temuan.append(_temuan(
+                "nilai kosong", dataset, "peringatan", df.loc[kosong, "Kabupaten/Kota"],
+                f"Nilai '{kolom}' kosong",
+            ))
+    return temuan
+
+
+def check_integer(df, dataset):
+    temuan = []
+    for kolom in BULAT[dataset]:
+        angka = pd.to_numeric(df[kolom], errors="coerce")
+        salah = df[kolom].isna() | (angka.notna() & (angka % 1 != 0))
+        if salah.any():
+            temuan.append(_temuan(
+                "bilangan bulat", dataset, "error", df.loc[salah, kolom].fillna("(kosong)"),
+                f"'{kolom}' harus berupa bilangan bulat dan tidak boleh kosong",
+            ))
+    return temuan
+
+
+def check_ranges(df, dataset):
+    temuan = []
+    for kolom, bawah, atas, inklusif in RENTANG[dataset]:
+        angka = pd.to_numeric(df[kolom], errors="coerce")
+        salah = pd.Series(False, index=df.index)
+        if bawah is not None:
+            salah |= (angka < bawah) if inklusif else (angka <= bawah)
+        if atas is not None:
+            salah |= angka > atas
+        if salah.any():
+            batas = f"{'≥' if inklusif else '>'} {bawah}" + (f" dan ≤ {atas}" if atas is not None else "")
+            temuan.append(_temuan(
+                "rentang", dataset, "error", df.loc[salah, "Kabupaten/Kota"],
+                f"'{kolom}' harus {batas}",
+            ))
+    return temuan
+
+
+def check_cases_vs_population(df):
+    kasus = pd.to_numeric(df["Jumlah Kasus HIV"], errors="coerce")
+    penduduk = pd.to_numeric(df["Jumlah Penduduk (Ribu)"], errors="coerce") * 1000
+    salah = kasus > penduduk
+    if salah.any():
+        return [_temuan("rentang", "data 2024", "error", df.loc[salah, "Kabupaten/Kota"],
+                        "Jumlah kasus melebihi jumlah penduduk")]
+    return []
+
+
+def check_duplicates(df, dataset, kunci):
+    dup = df.duplicated(subset=kunci, keep=False)
+    if dup.any():
+        contoh = df.loc[dup, kunci].astype(str).fillna("").agg(" / ".join, axis=1).drop_duplicates()
+        return [_temuan("duplikat", dataset, "error", contoh, f"Baris duplikat untuk {' × '.join(kunci)}")]
+    return []
+
+
+def check_join_coverage(kode_data, kode_geojson):
+    kode_data = pd.Index(kode_data)
+    kode_geojson = pd.Index(kode_geojson)
+    temuan = []
+    tanpa_peta = kode_data.difference(kode_geojson)
+    if len(tanpa_peta):
+        temuan.append(_temuan("cakupan join", "data 2024", "error", tanpa_peta,
+                              "Kab/kota tidak ditemukan di GeoJSON (tidak tampil di peta)"))
+    tanpa_data = kode_geojson.difference(kode_data)
+    if len(tanpa_data):
+        temuan.append(_temuan("cakupan join", "GeoJSON", "peringatan", tanpa_data,
+                              "Wilayah di GeoJSON tanpa data kasus"))
+    return temuan
+
+
+def check_year_gaps(df_trend):
+    tahun = pd.to_numeric(df_trend["Tahun"], errors="coerce")
+    if tahun.isna().all():
+        return []  # tidak ada tahun yang valid; dilaporkan oleh aturan tipe numerik
+    ada = pd.crosstab(df_trend["Kabupaten/Kota"], tahun).reindex(
+        columns=range(int(tahun.min()), int(tahun.max()) + 1), fill_value=0
+    )
+    hilang = ada.eq(0).stack()
+    hilang = hilang[hilang]
+    if len(hilang):
+        contoh = [f"{kab} ({th})" for kab, th in hilang.index]
+        return [_temuan("celah tahun", "data tren", "peringatan", contoh, "Tahun tidak tersedia untuk kab/kota")]
+    return []
+
+
+def check_district_consistency(df, df_trend):
+    beda = pd.Index(df_trend["Kabupaten/Kota"].unique()).difference(df["Kabupaten/Kota"])
+    if len(beda):
+        return [_temuan("konsistensi", "data tren", "peringatan", beda,
+                        "Kab/kota di data tren tidak ada di data 2024")]
+    return []
+
+
+def validate(df_raw, df_trend_raw, kode_geojson=None, kode_data=None):
+    """Jalankan semua aturan dan kembalikan laporan kualitas (dict, siap JSON).
+
+    `kode_data` adalah kode wilayah data 2024 yang dipakai untuk join ke
+    GeoJSON (`kode_geojson`). Cakupan join dilewati bila GeoJSON tidak ada."""
+    df_raw = df_raw.rename(columns=str.strip)
+    df_trend_raw = df_trend_raw.rename(columns=str.strip)
+
+    temuan = check_schema(df_raw, "data 2024") + check_schema(df_trend_raw, "data tren")
+    if not temuan:
+        temuan += check_numeric(df_raw, "data 2024")
+        temuan += check_ranges(df_raw, "data 2024")
+        temuan += check_cases_vs_population(df_raw)
+        temuan += check_duplicates(df_raw, "data 2024", ["Kabupaten/Kota"])
+        temuan += check_numeric(df_trend_raw, "data tren")
+        temuan += check_integer(df_trend_raw, "data tren")
+        temuan += check_ranges(df_trend_raw, "data tren")
+        temuan += check_duplicates(df_trend_raw, "data tren", ["Kabupaten/Kota", "Tahun"])
+        temuan += check_year_gaps(df_trend_raw)
+        temuan += check_district_consistency(df_raw, df_trend_raw)
+        if kode_geojson is not None and kode_data is not None:
+            temuan += check_join_coverage(kode_data, kode_geojson)
+
+    tingkat = {t["tingkat"] for t in temuan}
+    status = "error" if "error" in tingkat else "peringatan" if tingkat else "ok"
+    return {"status": status, "temuan": temuan}